@@ -1,7 +1,7 @@
 from datasets import load_dataset
 from datasets import DownloadConfig
 from tqdm import tqdm
-import json
+import orjson
 
 # Load Wikipedia dataset for 2025-12-01
 date = "20251201"
@@ -16,7 +16,8 @@ download_config = DownloadConfig(
 )
 
 try:
-    ds = load_dataset("wikipedia", language="en", date=date, download_config=download_config)['train']
+    # Stream rows so writing starts as soon as the first shard arrives
+    ds = load_dataset("wikipedia", language="en", date=date, download_config=download_config, streaming=True)['train']
     print(f"Successfully loaded Wikipedia dataset from {date}")
 except Exception as e:
     print(f"Error loading dataset: {e}")
@@ -26,11 +27,11 @@ except Exception as e:
     print("3. Using extract_wiki_titles.py for titles only")
     raise
 
-with open(f"wikimedia-wikipedia-{date}.jsonl", "w") as f:
+with open(f"wikimedia-wikipedia-{date}.jsonl", "wb", buffering=4 * 1024 * 1024) as f:
     for doc in tqdm(ds, desc="Processing"):
         title = doc["title"]
         text = doc["text"]
         id_ = doc["id"]
-        f.write(json.dumps({"id": id_, "contents": f'{title}\n{text}'}) + "\n")
+        f.write(orjson.dumps({"id": id_, "contents": f'{title}\n{text}'}) + b"\n")
         
 
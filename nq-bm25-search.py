@@ -1,44 +1,43 @@
+import os
 from datasets import load_dataset
 from tqdm import tqdm
 from pyserini.search.lucene import LuceneSearcher
 
-nq = load_dataset("Tevatron/wikipedia-nq")
+nq = load_dataset("Tevatron/wikipedia-nq", num_proc=min(16, os.cpu_count()))
 
-queries = []
-for example in nq['train']:
-    queries.append(example['query'])
-
-for example in nq['dev']:
-    queries.append(example['query'])
-
-for example in nq['test']:
-    queries.append(example['query'])
-
-queries_ids = []
-for example in nq['train']:
-    queries_ids.append(f'train_{example["query_id"]}')
-
-for example in nq['dev']:
-    queries_ids.append(f'dev_{example["query_id"]}')
-
-for example in nq['test']:
-    queries_ids.append(f'{example["query_id"]}')
+# Pull whole columns per split instead of iterating rows
+queries = nq['train']['query'] + nq['dev']['query'] + nq['test']['query']
+train_ids = [f'train_{qid}' for qid in nq['train']['query_id']]
+dev_ids = [f'dev_{qid}' for qid in nq['dev']['query_id']]
+test_ids = [f'{qid}' for qid in nq['test']['query_id']]
+queries_ids = train_ids + dev_ids + test_ids
 
 searcher = LuceneSearcher("nq-ss-text-pyserini-index")
 
-results = searcher.batch_search(queries, queries_ids, 50, 10)
+# Search in chunks and write each chunk's hits before running the next,
+# so only one chunk of results is held in memory at a time
+search_chunk_size = 5000
+threads = os.cpu_count()
+
+# Constant TREC line fragments, pre-encoded for the binary run files
+Q0 = b' Q0 '
+SFX = b' bm25\n'
 
 doc_ids = set()
-with open('runs/run.bm25-train.trec', 'w') as f_train, open('runs/run.bm25-test.trec', 'w') as f_test, open('runs/run.bm25-dev.trec', 'w') as f_dev:
-    for id_, hits in results.items():
-        for i, hit in enumerate(hits):
-            if id_.startswith('train'):
-                f_train.write(f'{id_} Q0 {hit.docid} {i+1} {hit.score} bm25\n')
-            elif id_.startswith('dev'):
-                f_dev.write(f'{id_} Q0 {hit.docid} {i+1} {hit.score} bm25\n')
-            else:
-                f_test.write(f'{id_} Q0 {hit.docid} {i+1} {hit.score} bm25\n')
-            doc_ids.add(hit.docid)
+with open('runs/run.bm25-train.trec', 'wb', buffering=4 << 20) as f_train, open('runs/run.bm25-test.trec', 'wb', buffering=4 << 20) as f_test, open('runs/run.bm25-dev.trec', 'wb', buffering=4 << 20) as f_dev:
+    # Map each query id to its split's run file once, instead of prefix checks per hit
+    writer_of = {}
+    for split_ids, f_split in ((train_ids, f_train), (dev_ids, f_dev), (test_ids, f_test)):
+        writer_of.update(dict.fromkeys(split_ids, f_split))
+
+    for start in tqdm(range(0, len(queries), search_chunk_size), desc="Searching"):
+        end = start + search_chunk_size
+        results = searcher.batch_search(queries[start:end], queries_ids[start:end], 50, threads)
+        for id_, hits in results.items():
+            prefix = id_.encode() + Q0
+            writer_of[id_].write(b''.join(b'%b%b %d %b%b' % (prefix, hit.docid.encode(), i, str(hit.score).encode(), SFX)
+                                          for i, hit in enumerate(hits, 1)))
+            doc_ids.update(hit.docid for hit in hits)
 
 # print(f"Number of unique documents retrieved: {len(doc_ids)}")
 # with open("runs/retrieved_doc_ids_2024_short_top50_with_answer.txt", "w") as f:
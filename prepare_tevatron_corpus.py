@@ -1,6 +1,8 @@
 import os
 from tqdm import tqdm
-import json
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
 from datasets import load_dataset
 
 docids = []
@@ -8,13 +10,19 @@ with open("runs/retrieved_doc_ids_2024_short_top50_with_answer.txt", "r") as f:
     for line in f:
         docids.append(line.strip())
 
-ds = load_dataset("MrLight/wikipedia-20240520")['train']
-docid_to_idx = {docid: idx for idx, docid in enumerate(tqdm(ds["id"]))}
+ds = load_dataset("MrLight/wikipedia-20240520", num_proc=min(16, os.cpu_count()))['train']
 
+# Filter the Arrow table with a vectorized membership test per record batch
+# rather than materializing a docid -> idx dict over the whole dataset
+table = ds.data.table
+value_set = pa.array(docids, type=table.schema.field("id").type)
 
-with open('wiki-sc-final-tevatron.jsonl', 'w') as f:
-    for docid in tqdm(docids):
-        idx = docid_to_idx[docid]
-        title = ds[idx]['title']
-        text = " ".join(ds[idx]['text'].split()[:500])
-        f.write(json.dumps({"docid": docid, "text": text, "title": title}) + "\n")
\ No newline at end of file
+with open('wiki-sc-final-tevatron.jsonl', 'wb', buffering=4 * 1024 * 1024) as f:
+    for batch in tqdm(table.to_batches(max_chunksize=65536)):
+        batch = batch.filter(pc.is_in(batch.column("id"), value_set=value_set))
+        for docid, title, text in zip(batch.column("id").to_pylist(),
+                                      batch.column("title").to_pylist(),
+                                      batch.column("text").to_pylist()):
+            # maxsplit bounds the token list to 501 entries regardless of article length
+            text = " ".join(text.split(None, 500)[:500])
+            f.write(orjson.dumps({"docid": docid, "text": text, "title": title}) + b"\n")
@@ -1,11 +1,13 @@
 
+import os
 from datasets import load_dataset
 from tqdm import tqdm
-import json
+import pyarrow as pa
+import pyarrow.compute as pc
+import orjson
 
-# Load dataset and create mappings
-ds = load_dataset("MrLight/wikipedia-20240520")['train']
-docid_to_idx = {docid: idx for idx, docid in enumerate(tqdm(ds["id"]))}
+# Load dataset
+ds = load_dataset("MrLight/wikipedia-20240520", num_proc=min(16, os.cpu_count()))['train']
 
 # Load target document IDs
 target_doc_ids = set()
@@ -13,10 +15,18 @@ with open("runs/retrieved_doc_ids_2024_short_top50_with_answer.txt", "r") as f:
     for line in tqdm(f):
         target_doc_ids.add(line.strip())
 
-with open("wiki-2024-nq-top50-1.3M.jsonl", "w") as f:
-    for doc_id in tqdm(target_doc_ids):
-        docid = str(doc_id)
-        idx = docid_to_idx[docid]
-        title = ds[idx]['title']
-        text = " ".join(ds[idx]['text'].split()[:500])
-        f.write(json.dumps({"id": docid, "contents": f'{title}\n{text}'}) + "\n")
\ No newline at end of file
+# Scan the underlying Arrow table batch by batch and keep only the target rows,
+# instead of building a Python dict over every id in the dataset
+table = ds.data.table
+value_set = pa.array(list(target_doc_ids), type=table.schema.field("id").type)
+
+with open("wiki-2024-nq-top50-1.3M.jsonl", "wb", buffering=4 * 1024 * 1024) as f:
+    for batch in tqdm(table.to_batches(max_chunksize=65536)):
+        batch = batch.filter(pc.is_in(batch.column("id"), value_set=value_set))
+        for docid, title, text in zip(batch.column("id").to_pylist(),
+                                      batch.column("title").to_pylist(),
+                                      batch.column("text").to_pylist()):
+            docid = str(docid)
+            # maxsplit bounds the token list to 501 entries regardless of article length
+            text = " ".join(text.split(None, 500)[:500])
+            f.write(orjson.dumps({"id": docid, "contents": f'{title}\n{text}'}) + b"\n")
@@ -1,16 +1,21 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
-from PIL import Image
+import functools
 import os
 import sys
 import urllib.parse
 import time
 
+@functools.lru_cache(maxsize=None)
+def get_driver_path():
+    """Resolve the ChromeDriver path once per process (install() checks the network)"""
+    return ChromeDriverManager().install()
+
 def setup_driver(window_width=980, window_height=2000):
     """Set up Chrome WebDriver"""
-    driver_path = ChromeDriverManager().install()
-    service = Service(driver_path)
+    service = Service(get_driver_path())
     options = webdriver.ChromeOptions()
     
     # Find Chrome binary path
@@ -95,54 +100,59 @@ def capture_wiki_screenshot(title, output_dir="screenshots", output_filename=Non
     
     screenshot_path = os.path.join(output_dir, f"{output_filename}.png")
     
-    # Setup driver
-    driver = None
+    if full_page:
+        # For full page, start with a reasonable size, will resize later
+        window_size = (1200, 2000)
+    else:
+        window_size = (980, window_height)
     max_retries = 3
     
-    for attempt in range(max_retries):
-        try:
-            if full_page:
-                # For full page, start with a reasonable size, will resize later
-                driver = setup_driver(window_width=1200, window_height=2000)
-            else:
-                driver = setup_driver(window_width=980, window_height=window_height)
-            
-            print(f"Loading page (attempt {attempt + 1}/{max_retries})...")
-            
-            driver.get(url)
-            time.sleep(3)  # Wait for page to load
-            
-            # Check for error pages
-            if "Our servers are currently under maintenance" in driver.page_source:
-                raise Exception("Wikipedia maintenance page detected")
-            
-            # Take screenshot
-            if full_page:
-                print(f"Capturing full page screenshot...")
-                width, height = capture_full_page_screenshot(driver, screenshot_path)
-                print(f"Page dimensions: {width}x{height}px")
-            else:
-                print(f"Capturing screenshot (window height: {window_height}px)...")
-                driver.save_screenshot(screenshot_path)
-            
-            # Optimize image
-            with Image.open(screenshot_path) as img:
-                img.save(screenshot_path)
-            
-            file_size = os.path.getsize(screenshot_path) / 1024  # KB
-            print(f"Screenshot saved to: {screenshot_path} ({file_size:.1f} KB)")
-            return screenshot_path
-            
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"Error (attempt {attempt + 1}): {e}. Retrying...")
-                time.sleep(2)
-            else:
-                print(f"Failed after {max_retries} attempts: {e}")
-                raise
-        finally:
-            if driver:
-                driver.quit()
+    # Reuse the driver across retries of page-level errors, but replace it when
+    # the browser itself fails (crash, hang, dead session)
+    driver = None
+    try:
+        for attempt in range(max_retries):
+            try:
+                if driver is None:
+                    driver = setup_driver(*window_size)
+                print(f"Loading page (attempt {attempt + 1}/{max_retries})...")
+
+                driver.get(url)
+                time.sleep(3)  # Wait for page to load
+
+                # Check for error pages
+                if "Our servers are currently under maintenance" in driver.page_source:
+                    raise Exception("Wikipedia maintenance page detected")
+
+                # Take screenshot
+                if full_page:
+                    print(f"Capturing full page screenshot...")
+                    width, height = capture_full_page_screenshot(driver, screenshot_path)
+                    print(f"Page dimensions: {width}x{height}px")
+                else:
+                    print(f"Capturing screenshot (window height: {window_height}px)...")
+                    driver.save_screenshot(screenshot_path)
+
+                file_size = os.path.getsize(screenshot_path) / 1024  # KB
+                print(f"Screenshot saved to: {screenshot_path} ({file_size:.1f} KB)")
+                return screenshot_path
+
+            except Exception as e:
+                if isinstance(e, WebDriverException) and driver is not None:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass  # The session is already dead
+                    driver = None
+                if attempt < max_retries - 1:
+                    print(f"Error (attempt {attempt + 1}): {e}. Retrying...")
+                    time.sleep(2)
+                else:
+                    print(f"Failed after {max_retries} attempts: {e}")
+                    raise
+    finally:
+        if driver is not None:
+            driver.quit()
     
     return screenshot_path
 
@@ -1,148 +1,102 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from PIL import Image
+import asyncio
 import os
+import pyarrow as pa
+import pyarrow.compute as pc
 from datasets import load_dataset
 from tqdm import tqdm
-from multiprocessing import Pool, cpu_count, Manager
-import time
-import fcntl
+from playwright.async_api import async_playwright
 
-# Function to set up the Chrome WebDriver
-def setup_driver(shared_driver_path=None):
-    # Use file lock to ensure only one process downloads ChromeDriver
-    lock_file_path = "/tmp/chromedriver_download.lock"
-    
-    if shared_driver_path is not None and shared_driver_path.value:
-        driver_path = shared_driver_path.value
-    else:
-        # Use file lock to prevent concurrent downloads
-        lock_file = None
-        try:
-            lock_file = open(lock_file_path, 'w')
-            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)  # Exclusive lock
-            
-            # Download ChromeDriver (only happens once)
-            driver_path = ChromeDriverManager().install()
-            
-            # Store in shared variable if provided
-            if shared_driver_path is not None:
-                shared_driver_path.value = driver_path
-            
-            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)  # Release lock
-            lock_file.close()
-        except Exception as e:
-            # If lock fails, try to download anyway (might be cached)
-            if lock_file:
-                try:
-                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
-                    lock_file.close()
-                except:
-                    pass
-            driver_path = ChromeDriverManager().install()
-            if shared_driver_path is not None:
-                shared_driver_path.value = driver_path
-    
-    service = Service(driver_path)
-    options = webdriver.ChromeOptions()
-    
-    # Find Chrome binary path
-    import shutil
-    chrome_binary = None
-    for chrome_path in ['/usr/bin/google-chrome-stable', '/usr/bin/google-chrome', '/usr/bin/chromium-browser', '/usr/bin/chromium']:
-        if os.path.exists(chrome_path):
-            chrome_binary = chrome_path
-            break
-    
-    if chrome_binary:
-        options.binary_location = chrome_binary
-    
-    options.add_argument('--headless')  # Run in headless mode (no GUI)
-    options.add_argument('--disable-gpu')  # Disable GPU acceleration
-    options.add_argument('--window-size=980,980')  # Set the window size
-    options.add_argument('--no-sandbox')  # Required for running in some environments
-    options.add_argument('--disable-dev-shm-usage')  # Overcome limited resource problems
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+screenshot_dir = "screenshots"
+num_concurrent = 32  # Number of pages rendered concurrently in the shared browser
+done_manifest = os.path.join(screenshot_dir, ".done")  # Append-only list of captured doc ids
+
+# Find the row indices of the target doc ids with one vectorized lookup in the id column,
+# instead of building a Python dict over every id in the dataset
+def lookup_doc_rows(ds, doc_ids):
+    id_column = ds.data.table["id"]
+    rows = pc.index_in(pa.array(doc_ids, type=id_column.type), value_set=id_column)
+    return sorted(rows.drop_null().to_pylist())
 
 # Function to capture screenshot with retry mechanism
-def capture_screenshot(url_docid, driver, lock):
-    url, doc_id = url_docid
-    screenshot_dir = "screenshots"
-    os.makedirs(screenshot_dir, exist_ok=True)
+async def capture_screenshot(browser, done_file, url, doc_id):
+    screenshot_path = os.path.join(screenshot_dir, f"{doc_id}.png")
+    
+    # Cheap re-check for screenshots saved but not yet recorded in the manifest
+    if os.path.exists(screenshot_path):
+        done_file.write(f"{doc_id}\n")
+        return
     
     max_retries = 5
     for attempt in range(max_retries):
+        # A fresh context per attempt is cheap and isolates cookies/cache between pages
+        context = await browser.new_context(viewport={"width": 980, "height": 980})
         try:
-            driver.get(url)
-            if "Our servers are currently under maintenance or experiencing" in driver.page_source:
+            page = await context.new_page()
+            await page.goto(url)
+            if "Our servers are currently under maintenance or experiencing" in await page.content():
                 raise Exception("Error page loaded")
             
-            screenshot_path = os.path.join(screenshot_dir, f"{doc_id}.png")
-            driver.save_screenshot(screenshot_path)
-            
-            with Image.open(screenshot_path) as img:
-                img.save(screenshot_path)
-            
-            break  # Exit loop if successful
+            await page.screenshot(path=screenshot_path)
+            done_file.write(f"{doc_id}\n")
+            return  # Exit if successful
         except Exception as e:
-            if attempt < max_retries - 1:
-                with lock:
-                    print(f"Retry {attempt + 1} for {url} due to {e}")
-                time.sleep(5)
-            else:
-                with lock:
-                    print(f"Failed to capture screenshot for {url} after {max_retries} attempts: {e}")
-
-# Load dataset and create mappings
-ds = load_dataset("MrLight/wikipedia-20240520")['train']
-docid_to_idx = {docid: idx for idx, docid in enumerate(tqdm(ds["id"]))}
+            error = e
+        finally:
+            await context.close()
+        
+        if attempt < max_retries - 1:
+            tqdm.write(f"Retry {attempt + 1} for {url} due to {error}")
+            await asyncio.sleep(5)
+        else:
+            tqdm.write(f"Failed to capture screenshot for {url} after {max_retries} attempts: {error}")
 
-# Load existing screenshot ids
-existing_files = os.listdir("screenshots")
-existing_doc_ids = set()
-for file in existing_files:
-    if file.endswith(".png"):
-        existing_doc_ids.add(file.replace(".png", ""))
+# Each worker takes the next document from the shared iterator, so only
+# num_concurrent captures exist at a time however many documents there are
+async def capture_worker(browser, done_file, targets, pbar):
+    for url, doc_id in targets:
+        await capture_screenshot(browser, done_file, url, doc_id)
+        pbar.update(1)
 
-# Load target document IDs
-target_doc_ids = set()
-with open("doc_ids.txt", "r") as f:
-    for line in tqdm(f):
-        target_doc_ids.add(line.strip())
+async def capture_all(urls):
+    os.makedirs(screenshot_dir, exist_ok=True)
+    
+    # One headless Chromium hosts every page instead of one Chrome process per worker
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            # Line-buffered so every completed screenshot is recorded even if the run is interrupted
+            with open(done_manifest, "a", buffering=1) as done_file, tqdm(total=len(urls)) as pbar:
+                targets = iter(urls)
+                await asyncio.gather(*(capture_worker(browser, done_file, targets, pbar) for _ in range(num_concurrent)))
+        finally:
+            await browser.close()
 
-target_doc_ids = target_doc_ids - existing_doc_ids
-target_doc_ids = list(target_doc_ids)
+# Load dataset
+ds = load_dataset("MrLight/wikipedia-20240520", num_proc=min(16, os.cpu_count()))['train']
 
-# Create URLs for the target document IDs
-urls = [(f"https://en.wikipedia.org/wiki/{ds[docid_to_idx[doc_id]]['title']}", doc_id) for doc_id in target_doc_ids]
+# Load existing screenshot ids from the manifest with one sequential read,
+# seeding it from a directory scan the first time
+if os.path.exists(done_manifest):
+    with open(done_manifest, "r") as f:
+        existing_doc_ids = set(f.read().splitlines())
+else:
+    os.makedirs(screenshot_dir, exist_ok=True)
+    existing_doc_ids = {file[:-len(".png")] for file in os.listdir(screenshot_dir) if file.endswith(".png")}
+    with open(done_manifest, "w") as f:
+        f.writelines(f"{doc_id}\n" for doc_id in existing_doc_ids)
 
-# Initialize the lock and driver pool
-manager = Manager()
-lock = manager.Lock()
-shared_driver_path = manager.Value('s', '')  # Shared string value for driver path
-num_drivers = 5  # Number of parallel drivers to use
+# Load target document IDs that are not captured yet, filtering while reading
+# instead of building a second full set and subtracting
+with open("doc_ids.txt", "r") as f:
+    doc_ids = (line.strip() for line in tqdm(f))
+    target_doc_ids = list(dict.fromkeys(doc_id for doc_id in doc_ids if doc_id not in existing_doc_ids))
+del existing_doc_ids
 
-def worker_task(url_docid):
-    capture_screenshot(url_docid, driver, lock)
+# Create URLs for the target document IDs, pulling titles with one sorted select
+# instead of decoding a row per document
+target_rows = ds.select(lookup_doc_rows(ds, target_doc_ids))
+urls = [(f"https://en.wikipedia.org/wiki/{title}", doc_id) for doc_id, title in zip(target_rows["id"], target_rows["title"])]
 
-# Run the capture_screenshot function in parallel
+# Run the capture_screenshot tasks concurrently
 if __name__ == "__main__":
-    # Pre-download ChromeDriver in main process to avoid concurrent download issues
-    print("Pre-downloading ChromeDriver...")
-    initial_driver_path = ChromeDriverManager().install()
-    shared_driver_path.value = initial_driver_path
-    print(f"ChromeDriver ready at: {initial_driver_path}")
-    
-    # Create worker initializer with shared path
-    def init_worker():
-        global driver
-        driver = setup_driver(shared_driver_path)
-    
-    with Pool(num_drivers, initializer=init_worker) as pool:
-        list(tqdm(pool.imap_unordered(worker_task, urls), total=len(urls)))
-
-    # Cleanup: close the driver pool
-    # Note: drivers are closed automatically when pool closes
+    asyncio.run(capture_all(urls))
@@ -1,21 +1,21 @@
 from datasets import load_dataset
 from tqdm import tqdm
-import json
+from itertools import islice
+import orjson
 
 # Use wikimedia/wikipedia format: "YYYYMMDD.en"
-dataset = load_dataset("wikimedia/wikipedia", "20240501.en", num_proc=10)['train']
+# Streaming avoids downloading the full dump when only a sample is needed
+dataset = load_dataset("wikimedia/wikipedia", "20240501.en", streaming=True)['train']
 # print(dataset["train"][0])
 
 limit = 10  # Only output first 10 documents
 
-with open("wikipedia-doc-2024.jsonl", "w") as f:
-    for i, doc in enumerate(tqdm(dataset)):
-        if i >= limit:
-            break
+with open("wikipedia-doc-2024.jsonl", "wb", buffering=4 * 1024 * 1024) as f:
+    for doc in tqdm(islice(dataset, limit), total=limit):
         title = doc["title"]
         text = " ".join(doc["text"].split())
         id_ = doc["id"]
-        f.write(json.dumps({"id": id_, "contents": f'{title}\n{text}'}) + "\n")
+        f.write(orjson.dumps({"id": id_, "contents": f'{title}\n{text}'}) + b"\n")
 
 # dataset.save_to_disk("wikipedia-20240501", max_shard_size="1GB")
 
@@ -0,0 +1,266 @@
+"""
+Download Wikipedia dump files, shared by extract_wiki_dump.py and extract_wiki_titles.py.
+
+Uses aria2c when it is installed, otherwise splits the file across concurrent
+HTTP Range requests (and mirrors), and checks the result against the dump's
+published SHA-256.
+"""
+
+import os
+import hashlib
+import shutil
+import subprocess
+import threading
+import time
+import http.client
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from tqdm import tqdm
+
+def _download_range(urls: list, fd: int, start: int, end: int, on_progress, retries: int = 5) -> None:
+    """
+    Download bytes [start, end] of a file and write them at the same offset in fd.
+    
+    A failed or stalled request is retried from the first byte not yet written,
+    moving on to the next URL each time, with exponential backoff.
+    
+    Args:
+        urls: URLs serving the file (must support HTTP Range requests)
+        fd: File descriptor of the preallocated output file
+        start: First byte offset (inclusive)
+        end: Last byte offset (inclusive)
+        on_progress: Callback receiving the number of bytes written
+        retries: Number of retries before giving up
+    """
+    offset = start
+    for attempt in range(retries + 1):
+        url = urls[attempt % len(urls)]
+        try:
+            request = urllib.request.Request(url, headers={"Range": f"bytes={offset}-{end}"})
+            with urllib.request.urlopen(request, timeout=60) as response:
+                if response.status != 206:
+                    raise IOError(f"Server ignored Range request for {url} (HTTP {response.status})")
+                while True:
+                    buf = response.read(1024 * 1024)
+                    if not buf:
+                        break
+                    os.pwrite(fd, buf, offset)
+                    offset += len(buf)
+                    on_progress(len(buf))
+            if offset != end + 1:
+                raise IOError(f"Incomplete range {start}-{end} from {url}: got {offset - start} bytes")
+            return
+        except (OSError, http.client.HTTPException) as e:
+            if attempt == retries:
+                raise
+            print(f"\nRetrying bytes {offset}-{end} after error: {e}")
+            time.sleep(min(2 ** attempt, 30))
+
+def parallel_download(urls: list, dump_path: Path, connections: int = 8,
+                      chunk_size: int = 64 * 1024 * 1024) -> bool:
+    """
+    Download a file over several concurrent HTTP Range requests.
+    
+    The file is split into chunk_size pieces fetched by `connections` threads,
+    each written at its offset into a preallocated `.part` file that is renamed
+    into place once every range has arrived. When several URLs (mirrors) are
+    given, chunks are spread across them round-robin, and a chunk whose request
+    fails is resumed from another mirror.
+    
+    Args:
+        urls: URLs serving the same file; the first one is authoritative
+        dump_path: Destination path
+        connections: Number of concurrent connections
+        chunk_size: Size of each Range request in bytes
+        
+    Returns:
+        True if downloaded, False if the server does not support Range requests
+    """
+    with urllib.request.urlopen(urllib.request.Request(urls[0], method="HEAD")) as response:
+        size = int(response.headers.get("Content-Length") or 0)
+        if not size or response.headers.get("Accept-Ranges") != "bytes":
+            return False
+    
+    # Only use mirrors that serve a file of the same size
+    sources = [urls[0]]
+    for url in urls[1:]:
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, method="HEAD")) as response:
+                if int(response.headers.get("Content-Length") or 0) == size:
+                    sources.append(url)
+                    continue
+        except urllib.error.URLError:
+            pass
+        print(f"Skipping mirror {url} (unavailable or different file size)")
+    
+    part_path = dump_path.with_name(dump_path.name + ".part")
+    with open(part_path, "wb") as f:
+        f.truncate(size)
+    
+    ranges = [(start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size)]
+    lock = threading.Lock()
+    fd = os.open(part_path, os.O_WRONLY)
+    executor = ThreadPoolExecutor(max_workers=connections)
+    futures = []
+    try:
+        with tqdm(total=size, unit="B", unit_scale=True, desc="Downloading") as pbar:
+            def on_progress(n):
+                with lock:
+                    pbar.update(n)
+            
+            futures = [
+                executor.submit(_download_range, sources[i % len(sources):] + sources[:i % len(sources)],
+                                fd, start, end, on_progress)
+                for i, (start, end) in enumerate(ranges)
+            ]
+            for future in as_completed(futures):
+                future.result()
+    finally:
+        # On a failed range, drop the queued ones instead of downloading the rest of
+        # the file first; ranges already in flight are waited for, as they write to fd.
+        # (shutdown(cancel_futures=True) would do the same, but needs Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown()
+        os.close(fd)
+    
+    part_path.replace(dump_path)
+    return True
+
+def fetch_sha256(date: str, dump_filename: str, base_url: str = "https://dumps.wikimedia.org/enwiki") -> str:
+    """
+    Look up the published SHA-256 of a dump file in the dump's sha256sums list.
+    
+    Args:
+        date: Date in YYYYMMDD format
+        dump_filename: Name of the file within the dump directory
+        base_url: Base URL of the dump site
+        
+    Returns:
+        Hex digest, or None if the list is unavailable or does not mention the file
+    """
+    sums_url = f"{base_url}/{date}/enwiki-{date}-sha256sums.txt"
+    try:
+        with urllib.request.urlopen(sums_url) as response:
+            for line in response.read().decode().splitlines():
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == dump_filename:
+                    return parts[0]
+    except urllib.error.URLError:
+        pass
+    return None
+
+def sha256_file(path: Path, chunk_size: int = 8 * 1024 * 1024) -> str:
+    """Compute the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f, \
+            tqdm(total=os.path.getsize(path), unit="B", unit_scale=True, desc="Verifying") as pbar:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+            pbar.update(len(chunk))
+    return digest.hexdigest()
+
+def aria2c_download(urls: list, dump_path: Path, connections: int = 8, sha256: str = None) -> int:
+    """
+    Download a file with aria2c, which splits it across connections and mirrors,
+    resumes partial downloads and checks the SHA-256 itself.
+    
+    Args:
+        urls: URLs serving the same file
+        dump_path: Destination path
+        connections: Number of concurrent connections
+        sha256: Expected hex digest (optional)
+        
+    Returns:
+        aria2c exit code (0 on success, 3 if the file was not found)
+    """
+    cmd = [
+        "aria2c",
+        "--continue=true",
+        f"--split={connections}",
+        f"--max-connection-per-server={min(connections, 16)}",  # aria2c caps this at 16
+        "--min-split-size=64M",
+        "--dir", str(dump_path.parent),
+        "--out", dump_path.name,
+    ]
+    if sha256:
+        cmd.append(f"--checksum=sha-256={sha256}")
+    return subprocess.run(cmd + urls).returncode
+
+def download_dump(date: str, output_dir: Path = Path("."), mirrors: list = None, connections: int = 8,
+                  dump_filename: str = None) -> Path:
+    """
+    Download Wikipedia dump file for the given date.
+    
+    Args:
+        date: Date in YYYYMMDD format (e.g., "20240501")
+        output_dir: Directory to save the dump file
+        mirrors: Optional base URLs of Wikimedia dump mirrors (e.g.
+                 "https://ftp.acc.umu.se/mirror/wikimedia.org/dumps/enwiki")
+                 to spread the download across
+        connections: Number of concurrent HTTP connections
+        dump_filename: File to download from the dump directory
+                       (default: enwiki-{date}-pages-articles.xml.bz2)
+        
+    Returns:
+        Path to the downloaded dump file
+    """
+    base_url = "https://dumps.wikimedia.org/enwiki"
+    dump_filename = dump_filename or f"enwiki-{date}-pages-articles.xml.bz2"
+    dump_url = f"{base_url}/{date}/{dump_filename}"
+    
+    dump_path = output_dir / dump_filename
+    
+    if dump_path.exists():
+        print(f"Dump file already exists: {dump_path}")
+        return dump_path
+    
+    print(f"Downloading Wikipedia dump from {dump_url}...")
+    print("This may take a while as dump files are large (several GB)...")
+    
+    not_found = FileNotFoundError(
+        f"Dump file not found for date {date}. "
+        f"Available dates can be checked at: https://dumps.wikimedia.org/enwiki/"
+    )
+    expected_sha256 = fetch_sha256(date, dump_filename, base_url)
+    if not expected_sha256:
+        # Reported for aria2c and Python downloads alike
+        print(f"Warning: no published SHA-256 found for {dump_filename}, skipping verification")
+    urls = [dump_url] + [f"{mirror.rstrip('/')}/{date}/{dump_filename}" for mirror in (mirrors or [])]
+    
+    if shutil.which("aria2c"):
+        # aria2c verifies the checksum itself when one is given
+        returncode = aria2c_download(urls, dump_path, connections=connections, sha256=expected_sha256)
+        if returncode == 3:
+            raise not_found
+        if returncode != 0:
+            raise IOError(f"aria2c failed to download {dump_url} (exit code {returncode})")
+        print(f"Download complete: {dump_path}")
+        return dump_path
+    
+    try:
+        if parallel_download(urls, dump_path, connections=connections):
+            print(f"Download complete: {dump_path}")
+        else:
+            # Server does not support Range requests: fall back to a single stream
+            part_path = dump_path.with_name(dump_path.name + ".part")
+            with urllib.request.urlopen(dump_url) as response, open(part_path, "wb") as out:
+                size = int(response.headers.get("Content-Length") or 0) or None
+                with tqdm.wrapattr(response, "read", total=size, desc="Downloading") as stream:
+                    shutil.copyfileobj(stream, out, 1024 * 1024)
+            part_path.replace(dump_path)
+            print(f"Download complete: {dump_path}")
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            raise not_found
+        raise
+    
+    # Fail fast on a truncated or corrupted download instead of parsing it
+    if expected_sha256:
+        actual_sha256 = sha256_file(dump_path)
+        if actual_sha256 != expected_sha256:
+            dump_path.unlink()
+            raise IOError(f"SHA-256 mismatch for {dump_path}: expected {expected_sha256}, got {actual_sha256}")
+        print("Checksum verified")
+    return dump_path
@@ -8,61 +8,29 @@ This script:
 3. Parses the output to extract article IDs and content
 4. Saves to JSONL format compatible with existing code
 
+With --engine mwparserfromhell, steps 2-3 are replaced by streaming the dump
+directly and stripping the wikitext with mwparserfromhell in worker processes.
+
 Usage:
     python extract_wiki_dump.py [--date YYYYMMDD] [--limit N] [--output OUTPUT.jsonl]
 """
 
 import os
 import sys
-import json
+import bz2
 import subprocess
 import argparse
-import urllib.request
+import itertools
+import mmap
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from tqdm import tqdm
+import orjson
+import zstandard as zstd
+from lxml import etree
 
-def download_dump(date: str, output_dir: Path = Path(".")) -> Path:
-    """
-    Download Wikipedia dump file for the given date.
-    
-    Args:
-        date: Date in YYYYMMDD format (e.g., "20240501")
-        output_dir: Directory to save the dump file
-        
-    Returns:
-        Path to the downloaded dump file
-    """
-    # Wikipedia dumps are available at:
-    # https://dumps.wikimedia.org/enwiki/YYYYMMDD/enwiki-YYYYMMDD-pages-articles.xml.bz2
-    base_url = "https://dumps.wikimedia.org/enwiki"
-    dump_filename = f"enwiki-{date}-pages-articles.xml.bz2"
-    dump_url = f"{base_url}/{date}/{dump_filename}"
-    
-    dump_path = output_dir / dump_filename
-    
-    if dump_path.exists():
-        print(f"Dump file already exists: {dump_path}")
-        return dump_path
-    
-    print(f"Downloading Wikipedia dump from {dump_url}...")
-    print("This may take a while as dump files are large (several GB)...")
-    
-    def show_progress(block_num, block_size, total_size):
-        downloaded = block_num * block_size
-        percent = min(downloaded * 100 / total_size, 100)
-        print(f"\rDownloaded: {percent:.1f}% ({downloaded / (1024*1024):.1f} MB)", end="")
-    
-    try:
-        urllib.request.urlretrieve(dump_url, dump_path, show_progress)
-        print(f"\nDownload complete: {dump_path}")
-        return dump_path
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
-            raise FileNotFoundError(
-                f"Dump file not found for date {date}. "
-                f"Available dates can be checked at: https://dumps.wikimedia.org/enwiki/"
-            )
-        raise
+from dump_download import download_dump
 
 def check_wikiextractor():
     """Check if WikiExtractor is installed."""
@@ -83,6 +51,30 @@ def check_wikiextractor():
         except (FileNotFoundError, subprocess.TimeoutExpired):
             return False
 
+def run_wikiextractor(args: list) -> None:
+    """
+    Run WikiExtractor's command line entry point inside this process.
+    
+    This skips starting a second interpreter and re-importing wikiextractor;
+    WikiExtractor still forks its own extraction worker processes. The CLI is
+    used rather than process_dump() because its signature differs between
+    wikiextractor releases.
+    
+    Args:
+        args: WikiExtractor command line arguments
+    """
+    from wikiextractor import WikiExtractor
+    
+    argv = sys.argv
+    sys.argv = ["WikiExtractor"] + args
+    try:
+        WikiExtractor.main()
+    except SystemExit as e:
+        if e.code:
+            raise RuntimeError(f"WikiExtractor failed with exit code {e.code}")
+    finally:
+        sys.argv = argv
+
 def extract_articles(dump_path: Path, output_dir: Path = Path("extracted")) -> Path:
     """
     Extract articles from Wikipedia dump using WikiExtractor.
@@ -99,86 +91,321 @@ def extract_articles(dump_path: Path, output_dir: Path = Path("extracted")) -> P
     print(f"Extracting articles from {dump_path}...")
     print("This may take a while...")
     
-    # WikiExtractor command with JSON output
+    # WikiExtractor arguments with JSON output
     # --json: output in JSON format
     # --processes: number of parallel processes
-    cmd = [
-        "python", "-m", "wikiextractor.WikiExtractor",
+    run_wikiextractor([
         str(dump_path),
         "--json",
         "--output", str(output_dir),
         "--processes", "4",  # Adjust based on your CPU
         "--quiet"  # Suppress progress info (we'll show our own)
-    ]
+    ])
+    print(f"Extraction complete. Files saved to: {output_dir}")
+    return output_dir
+
+def _ordered_map(fn, items, workers: int):
+    """
+    Map fn over items in a process pool, yielding results in submission order.
     
+    At most 2 * workers items are in flight, so the input is consumed lazily and
+    stopping early leaves little wasted work.
+    
+    Args:
+        fn: Picklable function to run in the workers
+        items: Iterable of arguments for fn
+        workers: Number of worker processes
+        
+    Yields:
+        fn(item) for each item, in input order
+    """
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(executor.submit(fn, item) for item in itertools.islice(items, 2 * workers))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                item = next(items, None)
+                if item is not None:
+                    pending.append(executor.submit(fn, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+def _parse_one_file(json_file: Path) -> list:
+    """
+    Parse one extracted file into encoded JSONL lines (runs in a worker process).
+    
+    Args:
+        json_file: Path to a wiki_* file written by WikiExtractor
+        
+    Returns:
+        List of encoded output lines, one per valid article
+    """
+    lines = []
     try:
-        subprocess.run(cmd, check=True)
-        print(f"Extraction complete. Files saved to: {output_dir}")
-        return output_dir
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"WikiExtractor failed: {e}")
+        if os.path.getsize(json_file) == 0:
+            return lines
+        with open(json_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                # The file is scanned once, front to back
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            pos = 0
+            size = len(mm)
+            while pos < size:
+                # Slice one line at a time out of the mapping instead of readline
+                nl = mm.find(b'\n', pos)
+                if nl < 0:
+                    nl = size
+                line = mm[pos:nl]
+                pos = nl + 1
+                # orjson parses the raw bytes directly; blank lines fail to decode
+                # and are skipped like malformed ones
+                try:
+                    article = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                # WikiExtractor JSON format: {"id": "", "revid": "", "url": "", "title": "", "text": "..."}
+                if article.get("id") and article.get("title"):
+                    # Format: {"id": "", "title": "", "text": ""}
+                    doc = {
+                        "id": str(article.get("id", "")),
+                        "title": article.get("title", ""),
+                        "text": article.get("text", "")
+                    }
+                    lines.append(orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE))
+    except Exception as e:
+        print(f"Error reading {json_file}: {e}")
+    return lines
 
-def parse_extracted_files(extracted_dir: Path, limit: int = None) -> list:
+def iter_articles(extracted_dir: Path, limit: int = None, workers: int = None):
     """
-    Parse extracted JSON files and return list of articles.
+    Parse extracted JSON files in parallel and yield encoded articles in file order.
     
     Args:
         extracted_dir: Directory containing extracted files
-        limit: Maximum number of articles to return (None for all)
+        limit: Maximum number of articles to yield (None for all)
+        workers: Number of parser processes (default: CPU count)
         
-    Returns:
-        List of dictionaries with 'id', 'title', 'text', etc.
+    Yields:
+        Encoded JSONL lines with 'id', 'title' and 'text'
     """
-    articles = []
+    count = 0
     json_files = sorted(extracted_dir.glob("**/wiki_*"))
+    workers = workers or os.cpu_count()
     
-    print(f"Found {len(json_files)} extracted files. Parsing...")
+    print(f"Found {len(json_files)} extracted files. Parsing with {workers} workers...")
     
-    for json_file in tqdm(json_files, desc="Parsing files"):
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if limit and len(articles) >= limit:
-                        return articles
-                    
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    try:
-                        article = json.loads(line)
-                        # WikiExtractor JSON format: {"id": "", "revid": "", "url": "", "title": "", "text": "..."}
-                        if article.get("id") and article.get("title"):
-                            articles.append(article)
-                    except json.JSONDecodeError:
-                        continue
-        except Exception as e:
-            print(f"Error reading {json_file}: {e}")
-            continue
-    
-    return articles
+    # Keep a bounded window of files in flight so a --limit run does not parse
+    # the whole extraction
+    results = _ordered_map(_parse_one_file, json_files, workers)
+    for lines in tqdm(results, total=len(json_files), desc="Parsing files"):
+        if limit and count + len(lines) >= limit:
+            yield from lines[:limit - count]
+            return
+        count += len(lines)
+        yield from lines
+
+def check_mwparserfromhell():
+    """Check if mwparserfromhell is installed."""
+    try:
+        import mwparserfromhell
+        return True
+    except ImportError:
+        return False
+
+def iter_dump_pages(dump_path: Path, batch_size: int = 256):
+    """
+    Stream article pages straight out of the dump, in batches.
+    
+    Only main-namespace pages that are not redirects are kept, matching what
+    WikiExtractor emits by default.
+    
+    Args:
+        dump_path: Path to the .xml.bz2 (or plain .xml) dump
+        batch_size: Number of pages per batch
+        
+    Yields:
+        Lists of (id, title, wikitext) tuples
+    """
+    if dump_path.suffix == '.bz2':
+        file_handle = bz2.open(dump_path, 'rb')
+    else:
+        file_handle = open(dump_path, 'rb')
+    
+    batch = []
+    try:
+        context = etree.iterparse(file_handle, events=('end',), tag='{*}page', huge_tree=True)
+        title_tag = None
+        for event, page in context:
+            if title_tag is None:
+                # Qualify the child tags once from the first page's namespace
+                ns = page.tag[:page.tag.find('}') + 1]
+                title_tag, id_tag, ns_tag, redirect_tag = ns + 'title', ns + 'id', ns + 'ns', ns + 'redirect'
+                text_path = f'{ns}revision/{ns}text'
+            
+            title = page.findtext(title_tag)
+            page_id = page.findtext(id_tag)
+            if (title and page_id and page.findtext(ns_tag) == '0'
+                    and page.find(redirect_tag) is None):
+                batch.append((page_id, title, page.findtext(text_path) or ''))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            
+            # Clear the page and drop already-processed siblings still referenced by the root
+            page.clear(keep_tail=True)
+            while page.getprevious() is not None:
+                del page.getparent()[0]
+        if batch:
+            yield batch
+    finally:
+        file_handle.close()
+
+def _strip_pages(pages: list) -> list:
+    """
+    Convert a batch of pages to plain text with mwparserfromhell (runs in a worker process).
+    
+    Args:
+        pages: List of (id, title, wikitext) tuples
+        
+    Returns:
+        List of encoded output lines, one per page
+    """
+    import mwparserfromhell
+    
+    lines = []
+    for page_id, title, wikitext in pages:
+        text = mwparserfromhell.parse(wikitext).strip_code().strip()
+        doc = {"id": page_id, "title": title, "text": text}
+        lines.append(orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE))
+    return lines
+
+def iter_articles_from_dump(dump_path: Path, limit: int = None, workers: int = None):
+    """
+    Parse the dump directly, without WikiExtractor's intermediate files.
+    
+    Args:
+        dump_path: Path to the dump file
+        limit: Maximum number of articles to yield (None for all)
+        workers: Number of processes running mwparserfromhell (default: CPU count)
+        
+    Yields:
+        Encoded JSONL lines with 'id', 'title' and 'text'
+    """
+    count = 0
+    workers = workers or os.cpu_count()
+    
+    print(f"Parsing {dump_path} with mwparserfromhell using {workers} workers...")
+    
+    with tqdm(desc="Parsing pages", unit="page") as pbar:
+        for lines in _ordered_map(_strip_pages, iter_dump_pages(dump_path), workers):
+            pbar.update(len(lines))
+            if limit and count + len(lines) >= limit:
+                yield from lines[:limit - count]
+                return
+            count += len(lines)
+            yield from lines
 
-def save_to_jsonl(articles: list, output_path: Path):
+def save_to_jsonl(lines, output_path: Path, verbose: bool = True) -> int:
     """
-    Save articles to JSONL format.
+    Save encoded articles to a JSONL file as they are produced.
+    
+    Paths ending in .zst are compressed with multi-threaded zstd on the fly.
     
     Args:
-        articles: List of article dictionaries
-        output_path: Path to output JSONL file
+        lines: Iterable of encoded JSONL lines
+        output_path: Path to output JSONL (or .jsonl.zst) file
+        verbose: Whether to print progress messages
+        
+    Returns:
+        Number of articles written
     """
-    print(f"Saving {len(articles)} articles to {output_path}...")
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for article in tqdm(articles, desc="Writing"):
-            # Format: {"id": "", "title": "", "text": ""}
-            doc = {
-                "id": str(article.get("id", "")),
-                "title": article.get("title", ""),
-                "text": article.get("text", "")
-            }
-            f.write(json.dumps(doc, ensure_ascii=False) + "\n")
-    
-    print(f"Saved {len(articles)} articles to {output_path}")
+    if verbose:
+        print(f"Saving articles to {output_path}...")
+    
+    count = 0
+    # Collect encoded lines and write them in ~4 MiB batches
+    buf = []
+    buf_bytes = 0
+    with open(output_path, 'wb', buffering=8 * 1024 * 1024) as raw:
+        if output_path.suffix == '.zst':
+            f = zstd.ZstdCompressor(level=3, threads=-1).stream_writer(raw, closefd=False)
+        else:
+            f = raw
+        for line in lines:
+            buf.append(line)
+            buf_bytes += len(line)
+            count += 1
+            if buf_bytes >= 4 * 1024 * 1024:
+                f.write(b"".join(buf))
+                buf.clear()
+                buf_bytes = 0
+        f.write(b"".join(buf))
+        if f is not raw:
+            # Flush the final zstd frame before the file is closed
+            f.close()
+    
+    if verbose:
+        print(f"Saved {count} articles to {output_path}")
+    return count
+
+def shard_path(output_path: Path, shard_id: int) -> Path:
+    """
+    Name of one output shard, e.g. wikipedia-dump-20240501.part-00003.jsonl.zst.
+    
+    Args:
+        output_path: Output path the shards replace
+        shard_id: Index of the shard
+    """
+    name = output_path.name
+    for suffix in ('.jsonl.zst', '.zst', '.jsonl', ''):
+        if name.endswith(suffix):
+            break
+    base = name[:len(name) - len(suffix)]
+    return output_path.with_name(f"{base}.part-{shard_id:05d}{suffix}")
+
+def _write_shard(task) -> int:
+    """Parse a run of extracted files and write them as one shard (runs in a worker process)."""
+    json_files, output_path = task
+    lines = itertools.chain.from_iterable(map(_parse_one_file, json_files))
+    return save_to_jsonl(lines, output_path, verbose=False)
+
+def save_shards(extracted_dir: Path, output_path: Path, num_shards: int, workers: int = None) -> tuple:
+    """
+    Parse extracted files into num_shards output files, each written by its own worker.
+    
+    Shards cover contiguous runs of the sorted wiki_* files, so concatenating them
+    in order gives the same rows as a single output file.
+    
+    Args:
+        extracted_dir: Directory containing extracted files
+        output_path: Output path the shard names are derived from
+        num_shards: Number of shards to write
+        workers: Number of worker processes (default: CPU count)
+        
+    Returns:
+        Tuple of (number of articles written, list of shard paths)
+    """
+    json_files = sorted(extracted_dir.glob("**/wiki_*"))
+    num_shards = max(1, min(num_shards, len(json_files)))
+    workers = min(workers or os.cpu_count(), num_shards)
+    
+    per_shard, extra = divmod(len(json_files), num_shards)
+    tasks = []
+    start = 0
+    for shard_id in range(num_shards):
+        end = start + per_shard + (shard_id < extra)
+        tasks.append((json_files[start:end], shard_path(output_path, shard_id)))
+        start = end
+    
+    print(f"Found {len(json_files)} extracted files. Writing {num_shards} shards with {workers} workers...")
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        counts = list(tqdm(executor.map(_write_shard, tasks), total=num_shards, desc="Writing shards"))
+    
+    return sum(counts), [path for _, path in tasks]
 
 def main():
     parser = argparse.ArgumentParser(
@@ -200,23 +427,73 @@ def main():
         "--output",
         type=str,
         default=None,
-        help="Output JSONL file path (default: wikipedia-dump-{date}.jsonl)"
+        help="Output JSONL file path; a .zst suffix writes zstd-compressed output "
+             "(default: wikipedia-dump-{date}.jsonl)"
+    )
+    parser.add_argument(
+        "--num-shards",
+        type=int,
+        default=None,
+        help="Write the output as N shards ({output}.part-00000.jsonl, ...) in parallel "
+             "instead of one file (wikiextractor engine only)"
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Compress the output with zstd (default path becomes wikipedia-dump-{date}.jsonl.zst)"
     )
     parser.add_argument(
         "--skip-download",
         action="store_true",
         help="Skip download if dump file already exists"
     )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=8,
+        help="Number of concurrent HTTP connections for the download (default: 8)"
+    )
+    parser.add_argument(
+        "--mirrors",
+        nargs="+",
+        default=None,
+        help="Additional dump mirror base URLs to spread the download across "
+             "(e.g. https://ftp.acc.umu.se/mirror/wikimedia.org/dumps/enwiki)"
+    )
     parser.add_argument(
         "--skip-extraction",
         action="store_true",
         help="Skip extraction if extracted files already exist"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes for parsing articles (default: CPU count)"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["wikiextractor", "mwparserfromhell"],
+        default="wikiextractor",
+        help="How to turn wikitext into plain text: run WikiExtractor and parse its output "
+             "files, or stream the dump directly through mwparserfromhell (default: wikiextractor)"
+    )
     
     args = parser.parse_args()
     
-    # Check if WikiExtractor is available
-    if not check_wikiextractor():
+    if args.num_shards:
+        if args.limit:
+            parser.error("--num-shards cannot be combined with --limit")
+        if args.engine != "wikiextractor":
+            parser.error("--num-shards is only supported with --engine wikiextractor")
+    
+    # Check if the selected engine is available
+    if args.engine == "mwparserfromhell":
+        if not check_mwparserfromhell():
+            print("Error: mwparserfromhell is not installed.")
+            print("Please install it using: pip install mwparserfromhell")
+            sys.exit(1)
+    elif not check_wikiextractor():
         print("Error: WikiExtractor is not installed.")
         print("Please install it using: pip install wikiextractor")
         print("Or if using uv: uv pip install wikiextractor")
@@ -226,11 +503,14 @@ def main():
     dump_path = None
     if not args.skip_download:
         try:
-            dump_path = download_dump(args.date)
+            dump_path = download_dump(args.date, mirrors=args.mirrors, connections=args.connections)
         except FileNotFoundError as e:
             print(f"Error: {e}")
             print("\nAvailable dates can be checked at: https://dumps.wikimedia.org/enwiki/")
             sys.exit(1)
+        except IOError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
     else:
         dump_filename = f"enwiki-{args.date}-pages-articles.xml.bz2"
         dump_path = Path(dump_filename)
@@ -238,25 +518,42 @@ def main():
             print(f"Error: Dump file not found: {dump_path}")
             sys.exit(1)
     
-    # Extract articles
-    extracted_dir = Path("extracted")
-    if not args.skip_extraction or not extracted_dir.exists():
-        extract_articles(dump_path, extracted_dir)
+    output_path = Path(args.output) if args.output else Path(f"wikipedia-dump-{args.date}.jsonl")
+    if args.compress and output_path.suffix != '.zst':
+        output_path = output_path.with_name(output_path.name + '.zst')
+    
+    if args.engine == "mwparserfromhell":
+        # Parse the dump directly, no intermediate extracted files
+        articles = iter_articles_from_dump(dump_path, limit=args.limit, workers=args.workers)
     else:
-        print(f"Using existing extracted files in {extracted_dir}")
+        # Extract articles
+        extracted_dir = Path("extracted")
+        if not args.skip_extraction or not extracted_dir.exists():
+            extract_articles(dump_path, extracted_dir)
+        else:
+            print(f"Using existing extracted files in {extracted_dir}")
+        if not args.num_shards:
+            articles = iter_articles(extracted_dir, limit=args.limit, workers=args.workers)
     
-    # Parse and save
-    articles = parse_extracted_files(extracted_dir, limit=args.limit)
+    if args.num_shards:
+        # Each worker parses its files and writes its own shard
+        count, output_paths = save_shards(extracted_dir, output_path, args.num_shards, workers=args.workers)
+    else:
+        # Parse and save in a single streaming pass
+        count = save_to_jsonl(articles, output_path)
+        output_paths = [output_path]
     
-    if not articles:
+    if not count:
         print("Warning: No articles extracted!")
+        for path in output_paths:
+            path.unlink(missing_ok=True)
         sys.exit(1)
     
-    output_path = Path(args.output) if args.output else Path(f"wikipedia-dump-{args.date}.jsonl")
-    save_to_jsonl(articles, output_path)
-    
-    print(f"\nDone! Extracted {len(articles)} articles.")
-    print(f"Output saved to: {output_path}")
+    print(f"\nDone! Extracted {count} articles.")
+    if args.num_shards:
+        print(f"Output saved to {len(output_paths)} shards: {output_paths[0]} ... {output_paths[-1]}")
+    else:
+        print(f"Output saved to: {output_path}")
 
 if __name__ == "__main__":
     main()
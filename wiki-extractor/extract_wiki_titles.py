@@ -26,58 +26,78 @@ Usage:
     
     # Include disambiguation pages
     python extract_wiki_titles.py --include-disambiguation
+    
+    # The multistream dump is parsed in parallel across all cores by default;
+    # use the single-stream dump instead (optionally with a pool of parser workers).
+    # With --skip-download, the single-stream dump is also used when it is the only one on disk
+    python extract_wiki_titles.py --single-stream [--workers N]
+    
+    # Parse the single-stream dump while it downloads, optionally keeping a copy
+    python extract_wiki_titles.py --stream [--cache-dump]
+    
+    # Split the dump across machines, continuing a run if it was interrupted
+    python extract_wiki_titles.py --shard 0/4 [--resume]
+    
+    # Write zstd-compressed Parquet instead of JSONL
+    python extract_wiki_titles.py --format parquet [--output OUTPUT.parquet]
 """
 
-import xml.etree.ElementTree as ET
+import os
+import queue
+import re
 import bz2
+import html
+import io
 import argparse
+import hashlib
 import json
+import shutil
+import signal
+import threading
 import urllib.request
 import subprocess
 import sys
+from collections import deque
+from multiprocessing import Pool
 from pathlib import Path
+from xml.parsers import expat
 from tqdm import tqdm
 
-def download_dump(date: str, output_dir: Path = Path(".")) -> Path:
-    """
-    Download Wikipedia dump file for the given date.
-    
-    Args:
-        date: Date in YYYYMMDD format (e.g., "20240501")
-        output_dir: Directory to save the dump file
-        
-    Returns:
-        Path to the downloaded dump file
-    """
-    base_url = "https://dumps.wikimedia.org/enwiki"
-    dump_filename = f"enwiki-{date}-pages-articles.xml.bz2"
-    dump_url = f"{base_url}/{date}/{dump_filename}"
-    
-    dump_path = output_dir / dump_filename
-    
-    if dump_path.exists():
-        print(f"Dump file already exists: {dump_path}")
-        return dump_path
-    
-    print(f"Downloading Wikipedia dump from {dump_url}...")
-    print("This may take a while as dump files are large (several GB)...")
-    
-    def show_progress(block_num, block_size, total_size):
-        downloaded = block_num * block_size
-        percent = min(downloaded * 100 / total_size, 100)
-        print(f"\rDownloaded: {percent:.1f}% ({downloaded / (1024*1024):.1f} MB)", end="")
-    
-    try:
-        urllib.request.urlretrieve(dump_url, dump_path, show_progress)
-        print(f"\nDownload complete: {dump_path}")
-        return dump_path
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
-            raise FileNotFoundError(
-                f"Dump file not found for date {date}. "
-                f"Available dates can be checked at: https://dumps.wikimedia.org/enwiki/"
-            )
-        raise
+from dump_download import download_dump, fetch_sha256
+
+try:
+    from lxml import etree as ET
+    # One parser per process, reused for every page; huge_tree lifts libxml2's
+    # 10 MB text node limit, which the longest articles exceed
+    _PAGE_PARSER = ET.XMLParser(huge_tree=True)
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _PAGE_PARSER = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Namespace prefixes of pages that are not articles, like Template:, Category:,
+# File:, Help:, Wikipedia:, Portal:, etc. Main namespace titles have no prefix.
+EXCLUDED_NAMESPACES = frozenset({
+    'Template', 'Category', 'File', 'Image', 'Help', 'Wikipedia',
+    'Portal', 'Book', 'Draft', 'User', 'MediaWiki', 'Module',
+    'Media', 'Special', 'Talk', 'User talk', 'Wikipedia talk',
+    'File talk', 'Template talk', 'Category talk', 'Help talk',
+    'Portal talk', 'Book talk', 'Draft talk', 'Module talk'
+})
+DISAMBIG_SUFFIX = '(disambiguation)'
+# The same namespace test as is_valid_article, for pyarrow's regex kernel
+_NAMESPACE_PATTERN = '^(?:' + '|'.join(sorted(EXCLUDED_NAMESPACES)) + '):'
 
 def is_valid_article(title: str, is_redirect: bool = False, filter_disambiguation: bool = True) -> bool:
     """
@@ -95,30 +115,39 @@ def is_valid_article(title: str, is_redirect: bool = False, filter_disambiguatio
     if is_redirect:
         return False
     
-    # Skip non-main namespace pages
-    # Main namespace has no prefix, other namespaces have prefixes like:
-    # Template:, Category:, File:, Help:, Wikipedia:, Portal:, etc.
-    if ':' in title:
-        # Check if it's a namespace prefix (not a colon in the middle of title)
-        parts = title.split(':', 1)
-        namespace = parts[0]
-        # Common namespaces to exclude
-        excluded_namespaces = {
-            'Template', 'Category', 'File', 'Image', 'Help', 'Wikipedia',
-            'Portal', 'Book', 'Draft', 'User', 'MediaWiki', 'Module',
-            'Media', 'Special', 'Talk', 'User talk', 'Wikipedia talk',
-            'File talk', 'Template talk', 'Category talk', 'Help talk',
-            'Portal talk', 'Book talk', 'Draft talk', 'Module talk'
-        }
-        if namespace in excluded_namespaces:
-            return False
+    # Skip non-main namespace pages (a colon later in the title is not a prefix)
+    idx = title.find(':')
+    if idx > 0 and title[:idx] in EXCLUDED_NAMESPACES:
+        return False
     
     # Optionally filter disambiguation pages
-    if filter_disambiguation and title.endswith('(disambiguation)'):
+    if filter_disambiguation and title.endswith(DISAMBIG_SUFFIX):
         return False
     
     return True
 
+def filter_articles(articles: list, filter_disambiguation: bool = True) -> list:
+    """
+    Drop namespace (and optionally disambiguation) pages from a batch of articles.
+    
+    Equivalent to calling is_valid_article on each non-redirect title, but with
+    pyarrow installed the titles are matched in one pass of its string kernels.
+    
+    Args:
+        articles: Article dicts with non-empty 'title' values
+        filter_disambiguation: Whether to filter disambiguation pages
+        
+    Returns:
+        The articles that pass the filters, in their original order
+    """
+    if pa is None or not articles:
+        return [a for a in articles if is_valid_article(a['title'], False, filter_disambiguation)]
+    titles = pa.array([a['title'] for a in articles], pa.string())
+    drop = pc.match_substring_regex(titles, _NAMESPACE_PATTERN)
+    if filter_disambiguation:
+        drop = pc.or_(drop, pc.ends_with(titles, DISAMBIG_SUFFIX))
+    return [articles[i] for i in pc.indices_nonzero(pc.invert(drop)).to_pylist()]
+
 def check_wikiextractor():
     """Check if WikiExtractor is installed."""
     try:
@@ -136,7 +165,8 @@ def check_wikiextractor():
         except (FileNotFoundError, subprocess.TimeoutExpired):
             return False
 
-def extract_with_wikiextractor(dump_path: Path, output_path: Path, limit: int = None, filter_disambiguation: bool = True):
+def extract_with_wikiextractor(dump_path: Path, output_path: Path, limit: int = None, filter_disambiguation: bool = True,
+                               output_format: str = 'jsonl'):
     """
     Extract titles, IDs, and cleaned text using WikiExtractor.
     
@@ -145,9 +175,10 @@ def extract_with_wikiextractor(dump_path: Path, output_path: Path, limit: int =
     
     Args:
         dump_path: Path to the Wikipedia dump XML file (can be .bz2 compressed)
-        output_path: Path to output JSONL file
+        output_path: Path to output JSONL (or Parquet) file
         limit: Maximum number of titles to extract (None for all)
         filter_disambiguation: Whether to filter disambiguation pages (default: True)
+        output_format: 'jsonl' or 'parquet' (default: 'jsonl')
     """
     if not check_wikiextractor():
         raise RuntimeError(
@@ -160,82 +191,395 @@ def extract_with_wikiextractor(dump_path: Path, output_path: Path, limit: int =
     print("Filtering: redirects, non-main namespace pages" + 
           (", disambiguation pages" if filter_disambiguation else ""))
     
-    # Create temporary directory for WikiExtractor output
-    import tempfile
-    import shutil
-    temp_dir = Path(tempfile.mkdtemp(prefix="wikiextractor_"))
+    # WikiExtractor writes its JSON lines to stdout, which is filtered and written
+    # out as it arrives; nothing is staged in a temporary directory
+    print("Running WikiExtractor (this may take a while)...")
+    cmd = [
+        sys.executable, "-m", "wikiextractor.WikiExtractor",
+        str(dump_path),
+        "--json",
+        "--output", "-",
+        "--processes", "4",
+        "--quiet"
+    ]
+    # In its own process group, so its extraction workers can be stopped with it
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=1024 * 1024, start_new_session=True)
     
+    count = 0
     try:
-        # Run WikiExtractor
-        print("Running WikiExtractor (this may take a while)...")
-        cmd = [
-            sys.executable, "-m", "wikiextractor.WikiExtractor",
-            str(dump_path),
-            "--json",
-            "--output", str(temp_dir),
-            "--processes", "4",
-            "--quiet"
-        ]
-        
-        subprocess.run(cmd, check=True)
-        
-        # Parse WikiExtractor output and apply filters
-        articles = []
-        json_files = sorted(temp_dir.glob("**/wiki_*"))
+        with open_article_writer(output_path, output_format, include_text=True) as out:
+            for line in tqdm(proc.stdout, desc="Filtering WikiExtractor output", unit=" pages"):
+                line = line.strip()
+                if not line:
+                    continue
+                
+                try:
+                    article = orjson.loads(line) if orjson is not None else json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                
+                # WikiExtractor JSON format: {"id": "", "revid": "", "url": "", "title": "", "text": "..."}
+                title = article.get("title", "")
+                page_id = article.get("id", "")
+                
+                # Apply same filters as direct XML parsing
+                if title and page_id and is_valid_article(title, is_redirect=False, filter_disambiguation=filter_disambiguation):
+                    out.write([{
+                        'id': page_id,
+                        'title': title,
+                        'text': article.get('text', '')  # Already cleaned by WikiExtractor
+                    }])
+                    count += 1
+                    if limit and count >= limit:
+                        break
+    finally:
+        # Stop WikiExtractor early if the limit was reached or writing failed
+        if proc.poll() is None and (limit and count >= limit or sys.exc_info()[0]):
+            os.killpg(proc.pid, signal.SIGTERM)
+        proc.stdout.close()
+        returncode = proc.wait()
+    
+    if returncode and not (limit and count >= limit):
+        raise RuntimeError(f"WikiExtractor failed with exit code {returncode}")
+    
+    print(f"\nDone! Extracted {count} articles with cleaned text.")
+    print(f"Output saved to: {output_path}")
+
+class _PageState:
+    """Fields of the page iter_pages_expat is currently inside, reused across pages."""
+    
+    __slots__ = ('id', 'title', 'redirect', 'text')
+    
+    def reset(self):
+        self.id = ''
+        self.title = ''
+        self.redirect = False
+        self.text = None
+
+def iter_pages_expat(stream, include_text: bool = False, chunk_size: int = 1024 * 1024):
+    """
+    Extract pages from the dump with expat callbacks, without building elements.
+    
+    Only the page title, page id, redirect flag and (optionally) revision text
+    are collected. The character data handler is only installed while one of
+    those elements is open, so expat never hands any other text to Python.
+    
+    Args:
+        stream: Binary file object with the (decompressed) dump XML
+        include_text: Whether to extract the raw article text
+        chunk_size: Number of bytes fed to the parser at a time
         
-        print(f"Found {len(json_files)} extracted files. Parsing and filtering...")
+    Yields:
+        (page_id, title, is_redirect, text) tuples; text is None unless include_text is set
+    """
+    pages = []
+    stack = []
+    page = _PageState()
+    page.reset()
+    buf = []
+    capture = None
+    
+    def start(name, attrs):
+        nonlocal capture
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        if parent == 'page':
+            # Direct children only, so the revision and contributor ids are skipped
+            if name == 'title' or name == 'id':
+                capture = name
+                parser.CharacterDataHandler = buf.append
+            elif name == 'redirect':
+                page.redirect = True
+        elif name == 'page':
+            page.reset()
+        elif include_text and name == 'text' and parent == 'revision' and not page.redirect:
+            capture = name
+            parser.CharacterDataHandler = buf.append
+    
+    def end(name):
+        nonlocal capture
+        stack.pop()
+        if name == capture:
+            parser.CharacterDataHandler = None
+            setattr(page, name, ''.join(buf))
+            buf.clear()
+            capture = None
+        elif name == 'page':
+            pages.append((page.id, page.title, page.redirect, page.text))
+    
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    
+    while True:
+        chunk = stream.read(chunk_size)
+        parser.Parse(chunk, not chunk)
+        yield from pages
+        pages.clear()
+        if not chunk:
+            break
+
+# Fallback page extractor used when the XML parser rejects a dump. Inside <text>,
+# markup is entity-escaped, so the first </page> after a <page> always closes it.
+# Pages are cut out with bytes.find, and the fields are matched within each page.
+_TITLE_RE = re.compile(rb'<page>\s*<title>([^<]*)</title>')
+_ID_RE = re.compile(rb'<id>(\d+)</id>')
+_TEXT_RE = re.compile(rb'<text[^>]*?(/?)>')
+
+def iter_pages_regex(stream, include_text: bool = False, chunk_size: int = 4 * 1024 * 1024):
+    """
+    Extract pages from raw dump bytes with regexes, without an XML parser.
+    
+    The stream is read in chunk_size blocks; bytes after the last complete
+    </page> are carried over into the next block.
+    
+    Args:
+        stream: Binary file object with the (decompressed) dump XML
+        include_text: Whether to extract the raw article text
+        chunk_size: Number of bytes read per block
         
-        for json_file in tqdm(json_files, desc="Parsing WikiExtractor output"):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if limit and len(articles) >= limit:
-                            break
-                        
-                        line = line.strip()
-                        if not line:
-                            continue
-                        
-                        try:
-                            article = json.loads(line)
-                            # WikiExtractor JSON format: {"id": "", "revid": "", "url": "", "title": "", "text": "..."}
-                            title = article.get("title", "")
-                            page_id = article.get("id", "")
-                            
-                            # Apply same filters as direct XML parsing
-                            if title and page_id and is_valid_article(title, is_redirect=False, filter_disambiguation=filter_disambiguation):
-                                articles.append({
-                                    'id': page_id,
-                                    'title': title,
-                                    'text': article.get('text', '')  # Already cleaned by WikiExtractor
-                                })
-                        except json.JSONDecodeError:
-                            continue
-                        
-                        if limit and len(articles) >= limit:
-                            break
-            except Exception as e:
-                print(f"Error reading {json_file}: {e}")
-                continue
-            
-            if limit and len(articles) >= limit:
+    Yields:
+        (page_id, title, is_redirect, text) tuples; text is None unless include_text is set
+    """
+    carry = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buf = carry + chunk
+        last_end = 0
+        pos = buf.find(b'<page>')
+        while pos >= 0:
+            end = buf.find(b'</page>', pos)
+            if end < 0:
                 break
-        
-        # Save to JSONL
-        print(f"\nSaving {len(articles)} articles to {output_path}...")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for article in tqdm(articles, desc="Writing"):
-                f.write(json.dumps(article, ensure_ascii=False) + "\n")
-        
-        print(f"\nDone! Extracted {len(articles)} articles with cleaned text.")
-        print(f"Output saved to: {output_path}")
-        
-    finally:
-        # Clean up temporary directory
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+            title_match = _TITLE_RE.match(buf, pos, end)
+            # The first <id> after the title is the page id; revision ids follow it
+            id_match = title_match and _ID_RE.search(buf, title_match.end(), end)
+            if id_match:
+                text = None
+                if include_text:
+                    text_match = _TEXT_RE.search(buf, id_match.end(), end)
+                    if text_match and not text_match.group(1):
+                        text_end = buf.find(b'</text>', text_match.end(), end)
+                        if text_end >= 0:
+                            text = html.unescape(buf[text_match.end():text_end].decode('utf-8'))
+                yield (id_match.group(1).decode('ascii'), html.unescape(title_match.group(1).decode('utf-8')),
+                       buf.find(b'<redirect', id_match.end(), end) >= 0, text)
+            last_end = end + len(b'</page>')
+            pos = buf.find(b'<page>', last_end)
+        carry = buf[last_end:]
 
-def extract_titles_only(dump_path: Path, output_path: Path, limit: int = None, filter_disambiguation: bool = True, include_text: bool = False):
+class _ReadaheadReader:
+    """
+    Read-only file wrapper that reads ahead of the consumer in a background thread,
+    so disk reads overlap with decompression and parsing.
+    """
+    
+    def __init__(self, raw, block_size: int = 1024 * 1024, depth: int = 32):
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._block = b''
+        self._pos = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, args=(raw, block_size), daemon=True)
+        self._thread.start()
+    
+    def _fill(self, raw, block_size):
+        # Tell the kernel this is one sequential pass, so it reads ahead aggressively,
+        # and drop pages once consumed so a multi-GB dump does not flush the page cache
+        fd = None
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                fd = raw.fileno()
+                dropped = raw.tell()
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except (AttributeError, OSError):
+                fd = None
+        try:
+            while not self._stop.is_set():
+                block = raw.read(block_size)
+                self._queue.put(block)
+                if not block:
+                    return
+                if fd is not None:
+                    offset = raw.tell()
+                    if offset - dropped >= 64 * 1024 * 1024:
+                        os.posix_fadvise(fd, dropped, offset - dropped, os.POSIX_FADV_DONTNEED)
+                        dropped = offset
+        except Exception as e:
+            self._queue.put(e)
+    
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return b''.join(iter(lambda: self.read(1024 * 1024), b''))
+        if self._pos >= len(self._block):
+            if self._eof:
+                return b''
+            block = self._queue.get()
+            if isinstance(block, Exception):
+                raise block
+            if not block:
+                self._eof = True
+                return b''
+            self._block, self._pos = block, 0
+        data = self._block[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+    
+    def close(self):
+        # Unblock a producer waiting on a full queue, then wait for it to exit
+        self._stop.set()
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self._thread.join()
+
+class _ProgressReader:
+    """Read-only file wrapper that advances a tqdm bar by the bytes read."""
+    
+    def __init__(self, raw, pbar):
+        self._raw = raw
+        self._pbar = pbar
+    
+    def read(self, size=-1):
+        data = self._raw.read(size)
+        self._pbar.update(len(data))
+        return data
+    
+    def close(self):
+        pass
+
+# Parallel bzip2 decompressors, preferred over the single-threaded bz2 module
+_PARALLEL_BZIP2_TOOLS = ('lbzip2', 'pbzip2')
+
+class _PipeDecompressor:
+    """
+    Read-only stream decompressing bz2 data through an external tool.
+    
+    A thread copies the compressed source into the tool's stdin while the
+    consumer reads decompressed bytes from its stdout. An error raised by the
+    source (e.g. a checksum mismatch) is re-raised to the consumer.
+    """
+    
+    def __init__(self, tool: str, source):
+        self._tool = tool
+        self._proc = subprocess.Popen([tool, '-dc'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      bufsize=1024 * 1024)
+        self._error = None
+        self._feeder = threading.Thread(target=self._feed, args=(source,), daemon=True)
+        self._feeder.start()
+    
+    def _feed(self, source):
+        try:
+            while block := source.read(1024 * 1024):
+                self._proc.stdin.write(block)
+        except (BrokenPipeError, ValueError):
+            # The consumer closed the stream early and the tool was stopped
+            pass
+        except Exception as e:
+            # Closing stdin below lets the tool finish; the consumer sees the error instead
+            self._error = e
+        finally:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+    
+    def read(self, size=-1):
+        data = self._proc.stdout.read(size)
+        if not data and size != 0:
+            returncode = self._proc.wait()
+            self._feeder.join()
+            self._raise_feed_error()
+            if returncode:
+                raise IOError(f"{self._tool} failed to decompress the dump (exit code {returncode})")
+        return data
+    
+    def _raise_feed_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+    
+    def close(self):
+        self._proc.stdout.close()
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        self._feeder.join()
+        self._raise_feed_error()
+
+class _TeeReader:
+    """
+    Read-only wrapper around a download that optionally saves and checksums the bytes read.
+    
+    The copy is written to a .part file that is renamed to cache_path once the
+    whole download has been read (and matched the checksum); an incomplete copy
+    is removed on close.
+    """
+    
+    def __init__(self, raw, cache_path: Path = None, sha256: str = None):
+        self._raw = raw
+        self._cache_path = cache_path
+        self._part_path = cache_path.with_name(cache_path.name + ".part") if cache_path else None
+        self._file = open(self._part_path, 'wb') if cache_path else None
+        self._sha256 = sha256
+        self._hash = hashlib.sha256() if sha256 else None
+    
+    def read(self, size=-1):
+        data = self._raw.read(size)
+        if self._hash:
+            self._hash.update(data)
+        if self._file:
+            self._file.write(data)
+        if not data and size != 0:
+            self._finish()
+        return data
+    
+    def _finish(self):
+        if self._hash:
+            actual = self._hash.hexdigest()
+            self._hash = None
+            if actual != self._sha256:
+                raise IOError(f"SHA-256 mismatch for the streamed dump: expected {self._sha256}, got {actual}")
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._part_path.replace(self._cache_path)
+            print(f"\nSaved the downloaded dump to {self._cache_path}")
+    
+    def close(self):
+        self._raw.close()
+        if self._file:
+            self._file.close()
+            self._part_path.unlink()
+
+def _open_tracked(raw, pbar, is_compressed: bool):
+    """
+    Wrap an open dump file so reads advance pbar, decompressing bz2 if needed.
+    
+    bz2 data goes through lbzip2 or pbzip2 when one is installed, so
+    decompression runs on several cores alongside the parser.
+    
+    Args:
+        raw: Binary file object with the dump bytes (closed by the caller)
+        pbar: tqdm bar counting on-disk bytes
+        is_compressed: Whether the file is bz2 compressed
+    """
+    reader = _ProgressReader(raw, pbar)
+    if not is_compressed:
+        return reader
+    for tool in _PARALLEL_BZIP2_TOOLS:
+        if shutil.which(tool):
+            return _PipeDecompressor(tool, reader)
+    return bz2.BZ2File(reader)
+
+def extract_titles_only(dump_path: Path, output_path: Path, limit: int = None, filter_disambiguation: bool = True, include_text: bool = False,
+                        workers: int = None, output_format: str = 'jsonl', stream_url: str = None,
+                        cache_dump: bool = False, expected_sha256: str = None):
     """
     Extract titles and IDs (and optionally text) from Wikipedia dump XML file.
     
@@ -245,177 +589,596 @@ def extract_titles_only(dump_path: Path, output_path: Path, limit: int = None, f
     
     Args:
         dump_path: Path to the Wikipedia dump XML file (can be .bz2 compressed)
-        output_path: Path to output JSONL file
+        output_path: Path to output JSONL (or Parquet) file
         limit: Maximum number of titles to extract (None for all)
         filter_disambiguation: Whether to filter disambiguation pages (default: True)
         include_text: Whether to extract article text content (default: False)
+        workers: Number of worker processes parsing pages; the dump is then read and
+                 decompressed in this process and cut into blocks (default: parse in
+                 this process with expat)
+        output_format: 'jsonl' or 'parquet' (default: 'jsonl')
+        stream_url: Parse the dump while downloading it from this URL instead of
+                    reading dump_path; download, decompression and parsing overlap
+        cache_dump: With stream_url, also save the downloaded dump to dump_path
+        expected_sha256: With stream_url, checksum the downloaded dump must match
     """
-    print(f"Extracting {'titles and text' if include_text else 'titles'} from {dump_path}...")
+    print(f"Extracting {'titles and text' if include_text else 'titles'} from {stream_url or dump_path}...")
     print("This will parse the XML file directly (no full extraction needed)...")
     print("Filtering: redirects, non-main namespace pages" + 
           (", disambiguation pages" if filter_disambiguation else ""))
     
-    articles = []
-    current_page = {}
-    in_revision = False
-    in_text = False
-    is_redirect = False
-    
     # Determine if file is compressed
     is_compressed = str(dump_path).endswith('.bz2')
     
-    # Open file (compressed or not)
-    if is_compressed:
-        file_handle = bz2.open(dump_path, 'rt', encoding='utf-8')
-    else:
-        file_handle = open(dump_path, 'r', encoding='utf-8')
+    # Fork the parser pool before anything below starts a thread or a decompressor:
+    # workers forked later would inherit the write end of lbzip2's stdin pipe, and
+    # lbzip2 would then never see EOF
+    pool = Pool(workers) if workers and workers > 1 else None
     
+    # Everything is opened inside the try, so the pool and whatever was opened
+    # are cleaned up when a later open fails (e.g. a 404 with stream_url)
+    raw = readahead = pbar = file_handle = out = None
+    count = 0
     try:
-        # Use iterparse for memory-efficient parsing
-        context = ET.iterparse(file_handle, events=('start', 'end'))
-        
-        for event, elem in tqdm(context, desc="Parsing XML"):
-            if event == 'start':
-                if elem.tag.endswith('page'):
-                    current_page = {}
-                    is_redirect = False
-                elif elem.tag.endswith('revision'):
-                    in_revision = True
-                elif elem.tag.endswith('redirect'):
-                    # This page is a redirect (alias)
-                    is_redirect = True
-            elif event == 'end':
-                if elem.tag.endswith('title') and not in_revision:
-                    current_page['title'] = elem.text or ''
-                elif elem.tag.endswith('id') and not in_revision and 'id' not in current_page:
-                    # Page ID (not revision ID)
-                    current_page['id'] = elem.text or ''
-                elif elem.tag.endswith('text') and include_text and in_revision:
-                    # Text content (can be very long)
-                    text = elem.text or ''
-                    if text:
-                        current_page['text'] = text
-                    in_text = False
-                elif elem.tag.endswith('revision'):
-                    in_revision = False
-                elif elem.tag.endswith('page'):
-                    # End of page, save if we have title and id and it's a valid article
-                    title = current_page.get('title', '')
-                    page_id = current_page.get('id', '')
-                    if title and page_id and is_valid_article(title, is_redirect, filter_disambiguation):
-                        article = {
-                            'id': page_id,
-                            'title': title
-                        }
-                        if include_text and 'text' in current_page:
-                            article['text'] = current_page['text']
-                        articles.append(article)
-                        
-                        if limit and len(articles) >= limit:
-                            break
-                    
-                    current_page = {}
-                    in_revision = False
-                    in_text = False
-                    is_redirect = False
-                    # Clear element to free memory
-                    elem.clear()
-                    
-    except ET.ParseError as e:
-        print(f"XML parsing error: {e}")
-        print("Trying alternative parsing method...")
-        # Fallback: simple line-by-line parsing
-        file_handle.close()
-        if is_compressed:
-            file_handle = bz2.open(dump_path, 'rt', encoding='utf-8')
+        # Open file (compressed or not) in binary mode; expat decodes UTF-8 in C.
+        # Progress is tracked on the bytes read from disk rather than per page.
+        if stream_url:
+            response = urllib.request.urlopen(stream_url, timeout=60)
+            total = int(response.headers.get("Content-Length") or 0) or None
+            raw = _TeeReader(response, dump_path if cache_dump else None, expected_sha256)
         else:
-            file_handle = open(dump_path, 'r', encoding='utf-8')
+            raw = open(dump_path, 'rb')
+            total = os.path.getsize(dump_path)
+        readahead = _ReadaheadReader(raw)
+        pbar = tqdm(total=total, unit='B', unit_scale=True, mininterval=0.5, desc="Parsing XML")
+        file_handle = _open_tracked(readahead, pbar, is_compressed)
         
-        articles = []
-        current_page = {}
-        in_title = False
-        in_id = False
-        in_revision = False
-        in_text = False
-        is_redirect = False
-        text_lines = []
+        # Articles are written as they are found; nothing is accumulated in memory
+        out = open_article_writer(output_path, output_format, include_text)
         
-        for line in tqdm(file_handle, desc="Parsing XML (line-by-line)"):
-            if limit and len(articles) >= limit:
-                break
-                
-            if '<revision>' in line:
-                in_revision = True
-                in_text = False
-                text_lines = []
-            elif '</revision>' in line:
-                if include_text and text_lines:
-                    current_page['text'] = ''.join(text_lines)
-                in_revision = False
-                in_text = False
-            elif '<redirect' in line:
-                # This page is a redirect (alias)
-                is_redirect = True
-            elif '<text' in line and include_text and in_revision:
-                # Start of text tag - text may span multiple lines
-                in_text = True
-                # Extract text from this line if it's self-contained
-                start = line.find('>') + 1
-                end = line.find('</text>')
-                if end > start:
-                    text_lines.append(line[start:end])
-                    in_text = False
-                elif start < len(line):
-                    text_lines.append(line[start:])
-            elif in_text and include_text:
-                # Collecting text content
-                if '</text>' in line:
-                    end = line.find('</text>')
-                    if end >= 0:
-                        text_lines.append(line[:end])
-                        in_text = False
-                else:
-                    text_lines.append(line)
-            elif '<title>' in line and not in_revision:
-                start = line.find('<title>') + 7
-                end = line.find('</title>')
-                if end > start:
-                    current_page['title'] = line[start:end]
-            elif '<id>' in line and not in_revision and 'id' not in current_page:
-                # Check if this is page id (not revision id)
-                start = line.find('<id>') + 4
-                end = line.find('</id>')
-                if end > start:
-                    current_page['id'] = line[start:end]
-            elif '</page>' in line:
-                title = current_page.get('title', '')
-                page_id = current_page.get('id', '')
+        if pool:
+            # Cut the decompressed stream into blocks of whole pages and parse them in the pool
+            tasks = ((block, include_text, filter_disambiguation) for block in iter_page_blocks(file_handle))
+            for batch in _imap_bounded(pool, _extract_pages, tasks, 2 * workers):
+                if limit:
+                    batch = batch[:limit - count]
+                out.write(batch)
+                count += len(batch)
+                if limit and count >= limit:
+                    break
+        else:
+            # Stream pages through expat callbacks; no element tree is built.
+            # Articles are collected and written 4096 at a time.
+            articles = []
+            for page_id, title, is_redirect, text in iter_pages_expat(file_handle, include_text):
                 if title and page_id and is_valid_article(title, is_redirect, filter_disambiguation):
                     article = {
                         'id': page_id,
                         'title': title
                     }
-                    if include_text and 'text' in current_page:
-                        article['text'] = current_page['text']
+                    if include_text and text:
+                        # Text content (can be very long)
+                        article['text'] = text
                     articles.append(article)
-                current_page = {}
-                in_revision = False
-                in_text = False
-                is_redirect = False
-                text_lines = []
+                    count += 1
+                    if len(articles) >= 4096:
+                        out.write(articles)
+                        articles.clear()
+                    
+                    if limit and count >= limit:
+                        break
+            out.write(articles)
+                    
+    except expat.ExpatError as e:
+        print(f"XML parsing error: {e}")
+        if stream_url:
+            raise IOError("A streamed dump cannot be re-read by the fallback parser; "
+                          "download it first and rerun with --skip-download") from e
+        print("Trying alternative parsing method...")
+        # Fallback: regex scan of the raw bytes, page by page
+        file_handle.close()
+        readahead.close()
+        raw.seek(0)
+        readahead = _ReadaheadReader(raw)
+        pbar.reset()
+        pbar.set_description("Parsing XML (regex)")
+        file_handle = _open_tracked(readahead, pbar, is_compressed)
+        
+        # The regex pass starts over from the beginning of the dump, and so does the output
+        out.restart()
+        count = 0
+        articles = []
+        for page_id, title, is_redirect, text in iter_pages_regex(file_handle, include_text):
+            if title and page_id and is_valid_article(title, is_redirect, filter_disambiguation):
+                article = {
+                    'id': page_id,
+                    'title': title
+                }
+                if include_text and text:
+                    article['text'] = text
+                articles.append(article)
+                count += 1
+                if len(articles) >= 4096:
+                    out.write(articles)
+                    articles.clear()
+                
+                if limit and count >= limit:
+                    break
+        out.write(articles)
     
     finally:
-        file_handle.close()
+        if pool:
+            pool.terminate()
+        for handle in (file_handle, readahead, raw, pbar, out):
+            if handle is not None:
+                handle.close()
+    
+    print(f"\nDone! Extracted {count} titles.")
+    print(f"Output saved to: {output_path}")
+
+def multistream_filenames(date: str) -> tuple:
+    """Return the (dump, index) file names of the multistream dump for a date."""
+    return (f"enwiki-{date}-pages-articles-multistream.xml.bz2",
+            f"enwiki-{date}-pages-articles-multistream-index.txt.bz2")
+
+_INDEX_OFFSET_RE = re.compile(rb'^(\d+):', re.M)
+
+def read_stream_offsets(index_path: Path) -> list:
+    """
+    Read the byte offsets of the independent bz2 streams in a multistream dump.
+    
+    Each index line is "offset:page_id:title"; every stream holds up to 100
+    pages, so consecutive lines share an offset.
+    
+    Args:
+        index_path: Path to the -multistream-index.txt.bz2 file
+        
+    Returns:
+        Sorted list of unique stream offsets
+    """
+    # The index is decompressed in large blocks and the offsets of all its lines are
+    # matched at once; progress is counted in compressed bytes rather than per line
+    offsets = {}
+    carry = b''
+    with open(index_path, 'rb') as raw, \
+            tqdm(total=os.path.getsize(index_path), unit='B', unit_scale=True, mininterval=0.5,
+                 desc="Reading stream index") as pbar, \
+            bz2.BZ2File(_ProgressReader(raw, pbar)) as f:
+        while True:
+            block = f.read(16 * 1024 * 1024)
+            if not block:
+                break
+            block = carry + block
+            cut = block.rfind(b'\n') + 1
+            offsets.update(dict.fromkeys(_INDEX_OFFSET_RE.findall(block, 0, cut)))
+            carry = block[cut:]
+    offsets.update(dict.fromkeys(_INDEX_OFFSET_RE.findall(carry)))
+    return [int(offset) for offset in offsets]
+
+def parse_page_blob(blob: bytes, include_text: bool = False, filter_disambiguation: bool = True):
+    """
+    Parse a single <page>...</page> element.
+    
+    Args:
+        blob: Raw bytes of one page element
+        include_text: Whether to include the raw article text
+        filter_disambiguation: Whether to filter disambiguation pages
+        
+    Returns:
+        Article dict with 'id', 'title' (and 'text'), or None if the page is filtered out
+    """
+    article = _read_page(blob, include_text)
+    if article is None or not is_valid_article(article['title'], False, filter_disambiguation):
+        return None
+    return article
+
+def _read_page(blob: bytes, include_text: bool):
+    """
+    Pull the fields of one <page> element straight out of its bytes.
+    
+    Inside a page, markup in titles and text is always entity-escaped, so the
+    first <title>, <id> and <text> tags are the real ones. Only the fields that
+    are kept are decoded. A page without the expected tags is parsed as XML.
+    
+    Args:
+        blob: Raw bytes of one page element
+        include_text: Whether to include the raw article text
+        
+    Returns:
+        Article dict, or None for redirects and pages without an id or title
+    """
+    rev = blob.find(b'<revision')
+    if rev < 0:
+        rev = len(blob)
+    if blob.find(b'<redirect', 0, rev) >= 0:
+        return None
+    title_start = blob.find(b'<title>', 0, rev)
+    title_end = blob.find(b'</title>', title_start, rev)
+    id_start = blob.find(b'<id>', title_end, rev)
+    id_end = blob.find(b'</id>', id_start, rev)
+    if title_start < 0 or title_end < 0 or id_start < 0 or id_end < 0:
+        return _read_page_tree(blob, include_text)
+    title = _unescape_xml(blob[title_start + 7:title_end])
+    page_id = blob[id_start + 4:id_end].decode('ascii')
+    if not (title and page_id):
+        return None
+    article = {'id': page_id, 'title': title}
+    if include_text:
+        text_start = blob.find(b'<text', rev)
+        if text_start >= 0:
+            text_start = blob.find(b'>', text_start) + 1
+            # <text ... /> is an empty revision
+            if text_start == 0 or blob[text_start - 2] != ord('/'):
+                text_end = blob.find(b'</text>', text_start)
+                if text_start == 0 or text_end < 0:
+                    # Unterminated text: let the XML parser deal with the page
+                    return _read_page_tree(blob, include_text)
+                text = _unescape_xml(blob[text_start:text_end])
+                if text:
+                    article['text'] = text
+    return article
+
+def _read_page_tree(blob: bytes, include_text: bool):
+    """Parse a <page> element with the XML parser; same result as _read_page()."""
+    page = ET.fromstring(blob, _PAGE_PARSER)
+    if page.find('redirect') is not None:
+        return None
+    title = page.findtext('title') or ''
+    page_id = page.findtext('id') or ''
+    if not (title and page_id):
+        return None
+    article = {'id': page_id, 'title': title}
+    if include_text:
+        text = page.findtext('revision/text')
+        if text:
+            article['text'] = text
+    return article
+
+def _unescape_xml(raw: bytes) -> str:
+    """Decode XML character data, normalizing line ends and resolving references as a parser would."""
+    if b'\r' in raw:
+        raw = raw.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    if b'&' in raw:
+        if b'&#' in raw:
+            # Numeric character references are rare in dumps
+            return html.unescape(raw.decode('utf-8'))
+        raw = (raw.replace(b'&lt;', b'<').replace(b'&gt;', b'>').replace(b'&quot;', b'"')
+               .replace(b'&apos;', b"'").replace(b'&amp;', b'&'))
+    return raw.decode('utf-8')
+
+def _extract_streams(task: tuple) -> list:
+    """
+    Decompress a byte range of consecutive bz2 streams and parse its pages (runs in a worker).
+    
+    Args:
+        task: (dump_path, start, end, include_text, filter_disambiguation)
+        
+    Returns:
+        List of article dicts in dump order
+    """
+    dump_path, start, end, include_text, filter_disambiguation = task
+    with open(dump_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
     
-    # Save to JSONL
-    print(f"\nSaving {len(articles)} titles to {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for article in tqdm(articles, desc="Writing"):
-            f.write(json.dumps(article, ensure_ascii=False) + "\n")
+    # The range holds several concatenated bz2 streams, each needing its own decompressor
+    chunks = []
+    while data:
+        decompressor = bz2.BZ2Decompressor()
+        chunks.append(decompressor.decompress(data))
+        data = decompressor.unused_data
+    return _parse_pages(b''.join(chunks), include_text, filter_disambiguation)
+
+def _parse_pages(xml: bytes, include_text: bool, filter_disambiguation: bool) -> list:
+    """
+    Parse every complete <page> element in a block of dump XML.
+    
+    Pages are sliced out of the bytes by _read_page(). A page that falls back to
+    the XML parser and is rejected by it is recovered with the regex scanner
+    instead, the same fallback extract_titles_only() applies to a whole dump. The title filters
+    are applied to the whole block at once with filter_articles().
+    
+    Args:
+        xml: Decompressed dump bytes
+        include_text: Whether to include the raw article text
+        filter_disambiguation: Whether to filter disambiguation pages
+        
+    Returns:
+        List of article dicts in dump order
+    """
+    articles = []
+    pos = xml.find(b'<page>')
+    while pos >= 0:
+        page_end = xml.find(b'</page>', pos)
+        if page_end < 0:
+            break
+        page_end += len(b'</page>')
+        blob = xml[pos:page_end]
+        try:
+            article = _read_page(blob, include_text)
+        except ET.ParseError:
+            article = None
+            for page_id, title, is_redirect, text in iter_pages_regex(io.BytesIO(blob), include_text):
+                if title and page_id and not is_redirect:
+                    article = {'id': page_id, 'title': title}
+                    if include_text and text:
+                        article['text'] = text
+        if article is not None:
+            articles.append(article)
+        pos = xml.find(b'<page>', page_end)
+    return filter_articles(articles, filter_disambiguation)
+
+def _extract_pages(task: tuple) -> list:
+    """
+    Parse one block of a single-stream dump (runs in a worker).
+    
+    Args:
+        task: (xml, include_text, filter_disambiguation)
+        
+    Returns:
+        List of article dicts in dump order
+    """
+    xml, include_text, filter_disambiguation = task
+    return _parse_pages(xml, include_text, filter_disambiguation)
+
+def iter_page_blocks(stream, block_size: int = 4 * 1024 * 1024):
+    """
+    Cut a decompressed dump stream into blocks that end on a </page> boundary.
+    
+    Args:
+        stream: Binary file object with the (decompressed) dump XML
+        block_size: Number of bytes read per block
+        
+    Yields:
+        Byte blocks holding whole <page> elements
+    """
+    carry = b''
+    while True:
+        chunk = stream.read(block_size)
+        if not chunk:
+            break
+        buf = carry + chunk
+        cut = buf.rfind(b'</page>')
+        if cut < 0:
+            carry = buf
+            continue
+        cut += len(b'</page>')
+        yield buf[:cut]
+        carry = buf[cut:]
+
+def _imap_bounded(pool, fn, tasks, window: int):
+    """
+    Like pool.imap, but with at most `window` tasks in flight, so a lazily
+    read input is not pulled into memory ahead of the workers.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(fn, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+def extract_titles_multistream(dump_path: Path, index_path: Path, output_path: Path, limit: int = None,
+                               filter_disambiguation: bool = True, include_text: bool = False,
+                               workers: int = None, streams_per_task: int = 50, output_format: str = 'jsonl',
+                               shard: tuple = None, resume: bool = False):
+    """
+    Extract titles and IDs (and optionally text) from a multistream dump in parallel.
+    
+    The multistream dump is a concatenation of independent bz2 streams of ~100
+    pages each, with their byte offsets listed in the companion index file. Groups
+    of streams are decompressed and parsed by a process pool, so decompression and
+    parsing scale with the number of cores.
+    Filters are the same as in extract_titles_only().
+    
+    JSONL runs record their progress in a <output>.progress file after every
+    task. With resume, a run picks up where the recorded one stopped; the file
+    is removed once the whole dump (or shard) has been processed.
+    
+    Args:
+        dump_path: Path to the enwiki-*-pages-articles-multistream.xml.bz2 file
+        index_path: Path to the matching -multistream-index.txt.bz2 file
+        output_path: Path to output JSONL (or Parquet) file
+        limit: Maximum number of titles to extract (None for all)
+        filter_disambiguation: Whether to filter disambiguation pages (default: True)
+        include_text: Whether to extract article text content (default: False)
+        workers: Number of worker processes (default: number of CPUs)
+        streams_per_task: Number of bz2 streams decoded per worker task
+        output_format: 'jsonl' or 'parquet' (default: 'jsonl')
+        shard: (index, count) to only process the index-th of count contiguous
+               ranges of streams, e.g. (0, 4) for the first quarter of the dump
+        resume: Whether to continue from the progress file of an interrupted run
+    """
+    print(f"Extracting {'titles and text' if include_text else 'titles'} from {dump_path} "
+          f"using {workers or os.cpu_count()} workers...")
+    print("Filtering: redirects, non-main namespace pages" + 
+          (", disambiguation pages" if filter_disambiguation else ""))
+    
+    offsets = read_stream_offsets(index_path)
+    # The last task runs to the end of the file, which also holds the closing </mediawiki> stream
+    end = dump_path.stat().st_size
+    if shard:
+        index, num_shards = shard
+        first, last = len(offsets) * index // num_shards, len(offsets) * (index + 1) // num_shards
+        if last < len(offsets):
+            end = offsets[last]
+        offsets = offsets[first:last]
+        print(f"Shard {index}/{num_shards}: {len(offsets)} streams")
+    bounds = offsets[::streams_per_task] + [end]
+    
+    count = 0
+    written = None
+    progress_path = output_path.with_name(output_path.name + '.progress') if output_format == 'jsonl' else None
+    progress = None
+    if resume and progress_path and progress_path.exists():
+        progress = json.loads(progress_path.read_text())
+        if not output_path.exists() or output_path.stat().st_size < progress['bytes']:
+            # The rows before the checkpoint are gone, so they have to be extracted again
+            print(f"Output {output_path} is missing or shorter than its progress file, starting over")
+            progress = None
+    if progress:
+        count, written = progress['count'], progress['bytes']
+        bounds = [start for start in bounds[:-1] if start >= progress['offset']] + [end]
+        print(f"Resuming at byte {progress['offset']} of the dump ({count} titles already written)")
+    elif progress_path and progress_path.exists():
+        # A fresh run must not leave an older run's progress behind for a later --resume
+        progress_path.unlink()
+    
+    tasks = [(dump_path, start, stop, include_text, filter_disambiguation)
+             for start, stop in zip(bounds[:-1], bounds[1:])]
+    
+    finished = True
+    with open_article_writer(output_path, output_format, include_text, resume_at=written) as out, Pool(workers) as pool:
+        for stop, batch in zip(bounds[1:], tqdm(pool.imap(_extract_streams, tasks), total=len(tasks), desc="Parsing streams")):
+            truncated = limit and len(batch) > limit - count
+            if truncated:
+                batch = batch[:limit - count]
+            out.write(batch)
+            count += len(batch)
+            # A task cut short by the limit is not checkpointed, so a resumed run
+            # redoes it from the previous checkpoint instead of skipping its remaining rows
+            if progress_path and not truncated:
+                _save_progress(progress_path, stop, out.checkpoint(), count)
+            if limit and count >= limit:
+                finished = stop == end and not truncated
+                break
+    if progress_path and finished and progress_path.exists():
+        progress_path.unlink()
     
-    print(f"\nDone! Extracted {len(articles)} titles.")
+    print(f"\nDone! Extracted {count} titles.")
     print(f"Output saved to: {output_path}")
 
+def _save_progress(progress_path: Path, offset: int, written: int, count: int):
+    """Record that the dump was processed up to offset, with written bytes of output."""
+    tmp_path = progress_path.with_name(progress_path.name + '.tmp')
+    tmp_path.write_text(json.dumps({'offset': offset, 'bytes': written, 'count': count}))
+    os.replace(tmp_path, progress_path)
+
+# Title-only rows always have this shape, so only their two values need encoding
+_TITLE_ROW = b'{"id":%s,"title":%s}\n'
+
+def article_line(article: dict) -> bytes:
+    """Format an article ({'id', 'title'[, 'text']}) as one UTF-8 encoded JSONL line."""
+    if orjson is not None:
+        if len(article) == 2:
+            return _TITLE_ROW % (orjson.dumps(article['id']), orjson.dumps(article['title']))
+        return orjson.dumps(article, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(article, ensure_ascii=False) + "\n").encode('utf-8')
+
+class _JsonlWriter:
+    """Write batches of article dicts as JSONL through a 4 MiB buffer."""
+    
+    def __init__(self, output_path: Path, resume_at: int = None):
+        if resume_at is None:
+            self._file = open(output_path, 'wb', buffering=4 * 1024 * 1024)
+        elif not output_path.exists() or output_path.stat().st_size < resume_at:
+            # Appending would silently lose the rows before resume_at (or pad them with NULs)
+            raise IOError(f"Cannot resume {output_path}: it is missing or shorter than {resume_at} bytes")
+        else:
+            # Drop anything written after the last checkpoint and append from there
+            self._file = open(output_path, 'r+b', buffering=4 * 1024 * 1024)
+            self._file.truncate(resume_at)
+            self._file.seek(resume_at)
+    
+    def write(self, articles: list):
+        self._file.write(b"".join(map(article_line, articles)))
+    
+    def checkpoint(self) -> int:
+        """Flush everything written so far to disk and return the output size."""
+        self._file.flush()
+        # The size is recorded as a resume point, so the bytes must be durable before it is
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+    
+    def restart(self):
+        """Discard everything written so far."""
+        self._file.seek(0)
+        self._file.truncate()
+    
+    def close(self):
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class _ParquetWriter:
+    """
+    Write batches of article dicts as a zstd-compressed Parquet file.
+    
+    Articles are buffered and written out in row groups of rows_per_group rows.
+    """
+    
+    def __init__(self, output_path: Path, include_text: bool, rows_per_group: int = 131072):
+        fields = [('id', pa.string()), ('title', pa.string())]
+        if include_text:
+            fields.append(('text', pa.large_string()))
+        self._path = output_path
+        self._schema = pa.schema(fields)
+        self._rows_per_group = rows_per_group
+        self._rows = []
+        self._writer = pq.ParquetWriter(output_path, self._schema, compression='zstd')
+    
+    def write(self, articles: list):
+        self._rows.extend(articles)
+        if len(self._rows) >= self._rows_per_group:
+            self._flush()
+    
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, self._schema))
+            self._rows.clear()
+    
+    def restart(self):
+        """Discard everything written so far."""
+        self._rows.clear()
+        self._writer.close()
+        self._writer = pq.ParquetWriter(self._path, self._schema, compression='zstd')
+    
+    def close(self):
+        self._flush()
+        self._writer.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def open_article_writer(output_path: Path, output_format: str = 'jsonl', include_text: bool = False,
+                        resume_at: int = None):
+    """
+    Open the output file for extracted articles.
+    
+    Args:
+        output_path: Path to the output file
+        output_format: 'jsonl' or 'parquet'
+        include_text: Whether articles have a 'text' field (sets the Parquet schema)
+        resume_at: Keep the first resume_at bytes of an existing JSONL file and append
+                   (the file must hold at least that many bytes)
+        
+    Returns:
+        Writer with write(articles), restart() and close() methods
+    """
+    if output_format == 'parquet':
+        if pa is None:
+            raise RuntimeError("Parquet output requires pyarrow. Please install it using: pip install pyarrow")
+        return _ParquetWriter(output_path, include_text)
+    return _JsonlWriter(output_path, resume_at)
+
+def parse_shard(value: str) -> tuple:
+    """Parse a --shard argument of the form i/N into (i, N)."""
+    try:
+        index, num_shards = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if not 0 <= index < num_shards:
+        raise argparse.ArgumentTypeError(f"shard index must be in [0, {num_shards}), got {index}")
+    return index, num_shards
+
 def main():
     parser = argparse.ArgumentParser(
         description="Extract only titles and IDs from Wikipedia dumps"
@@ -436,13 +1199,32 @@ def main():
         "--output",
         type=str,
         default=None,
-        help="Output JSONL file path (default: wikipedia-titles-{date}.jsonl)"
+        help="Output file path (default: wikipedia-titles-{date}.jsonl, or .parquet with --format parquet)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "parquet"],
+        default="jsonl",
+        help="Output format: JSONL, or zstd-compressed Parquet (requires pyarrow) (default: jsonl)"
     )
     parser.add_argument(
         "--skip-download",
         action="store_true",
         help="Skip download if dump file already exists"
     )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=8,
+        help="Number of concurrent HTTP connections for the download (default: 8)"
+    )
+    parser.add_argument(
+        "--mirrors",
+        nargs="+",
+        default=None,
+        help="Additional dump mirror base URLs to spread the download across "
+             "(e.g. https://ftp.acc.umu.se/mirror/wikimedia.org/dumps/enwiki)"
+    )
     parser.add_argument(
         "--include-disambiguation",
         action="store_true",
@@ -453,6 +1235,52 @@ def main():
         action="store_true",
         help="Extract article text content in addition to titles and IDs (default: False)"
     )
+    parser.add_argument(
+        "--multistream",
+        dest="multistream",
+        action="store_true",
+        default=True,
+        help="Use the multistream dump and its index to decompress and parse independent "
+             "bz2 streams in parallel (default; not used with --use-wikiextractor)"
+    )
+    parser.add_argument(
+        "--single-stream",
+        dest="multistream",
+        action="store_false",
+        help="Use the single-stream pages-articles dump, which is decompressed sequentially"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes parsing pages (default: number of CPUs for the "
+             "multistream dump, a single process with --single-stream)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse the single-stream dump while it downloads instead of saving it first "
+             "(implies --single-stream)"
+    )
+    parser.add_argument(
+        "--cache-dump",
+        action="store_true",
+        help="With --stream, also keep the downloaded dump on disk"
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="I/N",
+        help="Only process the I-th (from 0) of N contiguous ranges of the multistream dump, "
+             "e.g. to split one dump across machines (multistream dump only)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted multistream run from its .progress file "
+             "(JSONL output only)"
+    )
     parser.add_argument(
         "--use-wikiextractor",
         action="store_true",
@@ -462,34 +1290,87 @@ def main():
     )
     
     args = parser.parse_args()
+    if args.stream and args.use_wikiextractor:
+        parser.error("--stream cannot be used with --use-wikiextractor")
+    if args.cache_dump and not args.stream:
+        parser.error("--cache-dump requires --stream")
+    if (args.shard or args.resume) and not (args.multistream and not args.use_wikiextractor and not args.stream):
+        parser.error("--shard and --resume cannot be used with --single-stream, --stream or --use-wikiextractor")
+    if args.resume and args.format != "jsonl":
+        parser.error("--resume only supports --format jsonl")
+    
+    # Download dump (and the stream index for the multistream dump)
+    multistream = args.multistream and not args.use_wikiextractor and not args.stream
+    if multistream:
+        dump_filename, index_filename = multistream_filenames(args.date)
+    else:
+        dump_filename, index_filename = f"enwiki-{args.date}-pages-articles.xml.bz2", None
+    
+    # The multistream dump became the default later, so --skip-download runs may only
+    # have the single-stream dump on disk; use it rather than failing
+    if multistream and args.skip_download and not (Path(dump_filename).exists() and Path(index_filename).exists()):
+        single_filename = f"enwiki-{args.date}-pages-articles.xml.bz2"
+        if Path(single_filename).exists() and not (args.shard or args.resume):
+            print(f"Multistream dump not found, falling back to the single-stream dump {single_filename}")
+            multistream = False
+            dump_filename, index_filename = single_filename, None
     
-    # Download dump
     dump_path = None
-    if not args.skip_download:
+    index_path = None
+    stream_url = None
+    expected_sha256 = None
+    if args.stream and not Path(dump_filename).exists():
+        # Nothing is downloaded up front; the dump is read from the server while parsing
+        dump_path = Path(dump_filename)
+        stream_url = f"https://dumps.wikimedia.org/enwiki/{args.date}/{dump_filename}"
+        expected_sha256 = fetch_sha256(args.date, dump_filename)
+    elif not args.skip_download:
         try:
-            dump_path = download_dump(args.date)
+            dump_path = download_dump(args.date, mirrors=args.mirrors, connections=args.connections,
+                                      dump_filename=dump_filename)
+            if index_filename:
+                index_path = download_dump(args.date, mirrors=args.mirrors, connections=args.connections,
+                                           dump_filename=index_filename)
         except FileNotFoundError as e:
             print(f"Error: {e}")
             print("\nAvailable dates can be checked at: https://dumps.wikimedia.org/enwiki/")
             return
+        except IOError as e:
+            print(f"Error: {e}")
+            return
     else:
-        dump_filename = f"enwiki-{args.date}-pages-articles.xml.bz2"
         dump_path = Path(dump_filename)
-        if not dump_path.exists():
-            print(f"Error: Dump file not found: {dump_path}")
-            return
+        index_path = Path(index_filename) if index_filename else None
+        for path in (dump_path, index_path):
+            if path is not None and not path.exists():
+                print(f"Error: Dump file not found: {path}")
+                return
     
     # Extract titles (and optionally text)
     if args.use_wikiextractor:
         # Use WikiExtractor for cleaned text
         if not args.include_text:
             print("Warning: --use-wikiextractor requires --include-text. Enabling --include-text automatically.")
-        output_path = Path(args.output) if args.output else Path(f"wikipedia-dump-cleaned-{args.date}.jsonl")
-        extract_with_wikiextractor(dump_path, output_path, limit=args.limit, filter_disambiguation=not args.include_disambiguation)
+        output_path = Path(args.output) if args.output else Path(f"wikipedia-dump-cleaned-{args.date}.{args.format}")
+        extract_with_wikiextractor(dump_path, output_path, limit=args.limit, filter_disambiguation=not args.include_disambiguation,
+                                   output_format=args.format)
     else:
         # Direct XML parsing (faster, but text contains wiki markup if --include-text is used)
-        output_path = Path(args.output) if args.output else Path(f"wikipedia-{'dump' if args.include_text else 'titles'}-{args.date}.jsonl")
-        extract_titles_only(dump_path, output_path, limit=args.limit, filter_disambiguation=not args.include_disambiguation, include_text=args.include_text)
+        output_path = Path(args.output) if args.output else Path(f"wikipedia-{'dump' if args.include_text else 'titles'}-{args.date}.{args.format}")
+        if multistream:
+            if args.shard and not args.output:
+                output_path = output_path.with_suffix(f".shard-{args.shard[0]}-of-{args.shard[1]}{output_path.suffix}")
+            extract_titles_multistream(dump_path, index_path, output_path, limit=args.limit, filter_disambiguation=not args.include_disambiguation, include_text=args.include_text, workers=args.workers, output_format=args.format,
+                                       shard=args.shard, resume=args.resume)
+        else:
+            try:
+                extract_titles_only(dump_path, output_path, limit=args.limit, filter_disambiguation=not args.include_disambiguation, include_text=args.include_text, workers=args.workers, output_format=args.format,
+                                    stream_url=stream_url, cache_dump=args.cache_dump, expected_sha256=expected_sha256)
+            except urllib.error.HTTPError as e:
+                if e.code != 404:
+                    raise
+                print(f"Error: Dump file not found for date {args.date}: {stream_url}")
+                print("\nAvailable dates can be checked at: https://dumps.wikimedia.org/enwiki/")
 
 if __name__ == "__main__":
     main()